@@ -0,0 +1,161 @@
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from utils.sparse_fields import SparseFieldsFilter
+
+from .models import Tombstone
+
+# Position of a change in the feed: (timestamp, kind, id). At the same
+# timestamp updates sort before deletes.
+UPSERT, DELETE = 0, 1
+
+
+class WatermarkExpired(APIException):
+    status_code = 410
+    default_detail = "Marca d'água expirada; sincronize novamente sem updated_since."
+    default_code = "watermark_expired"
+
+
+def _after(position, kind, time_field, id_field):
+    # (time, kind, id) > position, for a stream whose kind is constant.
+    time, after_kind, after_id = position
+    if kind > after_kind:
+        return Q(**{f"{time_field}__gte": time})
+    if kind < after_kind:
+        return Q(**{f"{time_field}__gt": time})
+    return Q(**{f"{time_field}__gt": time}) | Q(
+        **{time_field: time, f"{id_field}__gt": after_id}
+    )
+
+
+class ChangeFeedMixin:
+    """
+    Turns a list view into a delta sync feed: ``GET ?updated_since=<watermark>``
+    returns the rows changed since the watermark in ``results``, the ids
+    deleted since then in ``deleted``, and the ``watermark`` to send next.
+    Without ``updated_since`` the feed starts from the first row; an ISO
+    datetime is accepted too.
+
+    Rows are read in (updated_at, id) order and held back for
+    CHANGE_FEED_SETTLE_SECONDS so transactions still in flight when a page
+    is read cannot commit behind the watermark. Tombstones live for
+    CHANGE_FEED_TOMBSTONE_DAYS; older watermarks answer 410 and the client
+    must resync from scratch.
+    """
+
+    filter_backends = [SparseFieldsFilter]
+    pagination_class = None
+    http_method_names = ["get", "head", "options"]
+    cursor_ordering = ("updated_at", "id")
+
+    watermark_query_param = "updated_since"
+    page_size = 500
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    invalid_watermark_message = "Marca d'água inválida."
+
+    def get(self, request, *args, **kwargs):
+        position = self.decode_watermark(request)
+        size = self.get_page_size(request)
+        until = timezone.now() - datetime.timedelta(
+            seconds=settings.CHANGE_FEED_SETTLE_SECONDS
+        )
+
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            updated_at__lte=until
+        )
+        tombstones = Tombstone.objects.filter(
+            resource=queryset.model._meta.label_lower, deleted_at__lte=until
+        )
+        if position is not None:
+            queryset = queryset.filter(_after(position, UPSERT, "updated_at", "id"))
+            tombstones = tombstones.filter(
+                _after(position, DELETE, "deleted_at", "object_id")
+            )
+
+        changes = [
+            ((instance.updated_at, UPSERT, instance.pk), instance)
+            for instance in queryset.order_by("updated_at", "id")[: size + 1]
+        ]
+        changes += [
+            ((deleted_at, DELETE, object_id), None)
+            for deleted_at, object_id in tombstones.order_by(
+                "deleted_at", "object_id"
+            ).values_list("deleted_at", "object_id")[: size + 1]
+        ]
+        changes.sort(key=lambda change: change[0])
+        has_more = len(changes) > size
+        changes = changes[:size]
+
+        if changes:
+            position = changes[-1][0]
+        serializer = self.get_serializer(
+            [instance for _, instance in changes if instance is not None], many=True
+        )
+        watermark = self.encode_watermark(position) if position else None
+        return Response(
+            {
+                "results": serializer.data,
+                "deleted": [key[2] for key, instance in changes if instance is None],
+                "watermark": watermark,
+                "has_more": has_more,
+                "next": (
+                    replace_query_param(
+                        request.build_absolute_uri(),
+                        self.watermark_query_param,
+                        watermark,
+                    )
+                    if has_more
+                    else None
+                ),
+            }
+        )
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def decode_watermark(self, request):
+        value = request.query_params.get(self.watermark_query_param)
+        if not value:
+            return None
+        try:
+            since = parse_datetime(value)
+        except ValueError:
+            since = None
+        if since is not None:
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            position = since, UPSERT, 0
+        else:
+            try:
+                time, kind, object_id = json.loads(base64.urlsafe_b64decode(value))
+                time = datetime.datetime.fromisoformat(time)
+                if timezone.is_naive(time):
+                    raise ValueError
+                position = time, int(kind), int(object_id)
+            except (TypeError, ValueError):
+                raise NotFound(self.invalid_watermark_message)
+        retention = datetime.timedelta(days=settings.CHANGE_FEED_TOMBSTONE_DAYS)
+        if position[0] < timezone.now() - retention:
+            raise WatermarkExpired()
+        return position
+
+    def encode_watermark(self, position):
+        time, kind, object_id = position
+        payload = json.dumps([time.isoformat(), kind, object_id])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
@@ -0,0 +1,288 @@
+import asyncio
+import functools
+import logging
+import threading
+
+import orjson
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.db import transaction
+
+from utils.metrics import SSE_CONNECTIONS
+
+from .models import Ad
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "ads:events"
+# Sent to listeners that may have missed events; they resync through the
+# change feeds.
+RESET = {"type": "reset"}
+RETRY_MILLISECONDS = 5000
+
+
+def ad_event(ad_id, store_id, category_id, action="saved"):
+    return {
+        "type": "ad",
+        "action": action,
+        "id": ad_id,
+        "store": store_id,
+        "category": category_id,
+    }
+
+
+def public_ad_events(ad_ids):
+    """
+    Events for ads changed in bulk, as the public endpoints see them: ads no
+    longer public (inactive, unpublished or out of schedule) are "deleted".
+    """
+    ads = (
+        Ad.objects.filter(id__in=ad_ids)
+        .select_related("product")
+        .only(
+            "id",
+            "store",
+            "active",
+            "published",
+            "start_date",
+            "end_date",
+            "product__category",
+        )
+    )
+    return [
+        ad_event(
+            ad.pk,
+            ad.store_id,
+            ad.product.category_id if ad.product else None,
+            "saved" if ad.is_public() else "deleted",
+        )
+        for ad in ads
+    ]
+
+
+def product_event(product, action="saved"):
+    # Inactive products are not public: announce them as deleted, no price.
+    event = {
+        "type": "product",
+        "action": action,
+        "id": product.pk,
+        "category": product.category_id,
+    }
+    if action == "saved":
+        event["sale_price"] = str(product.sale_price)
+    return event
+
+
+def price_event(product, previous):
+    return {
+        "type": "price",
+        "id": product.pk,
+        "category": product.category_id,
+        "sale_price": str(product.sale_price),
+        "previous": str(previous),
+    }
+
+
+class EventFilter:
+    """
+    Per-connection filters: ``?types=ad,price&store=1,2&category=3``. Each
+    filter given keeps only the events carrying one of its values, so
+    ``store`` keeps ad events only. Resets always pass.
+    """
+
+    def __init__(self, types=None, stores=None, categories=None):
+        self.types = types
+        self.stores = stores
+        self.categories = categories
+
+    @classmethod
+    def from_query(cls, params):
+        def values(name, convert=str):
+            value = params.get(name, "").strip()
+            if not value:
+                return None
+            return {convert(item) for item in value.split(",") if item.strip()}
+
+        return cls(values("types"), values("store", int), values("category", int))
+
+    def matches(self, event):
+        if event["type"] == RESET["type"]:
+            return True
+        return (
+            (self.types is None or event["type"] in self.types)
+            and (self.stores is None or event.get("store") in self.stores)
+            and (self.categories is None or event.get("category") in self.categories)
+        )
+
+
+class Subscription:
+    """
+    One listener: a bounded queue on the listener's event loop. A listener
+    that falls ``maxsize`` events behind has its backlog replaced by a
+    single reset, so a slow client neither holds memory nor blocks
+    publishers.
+    """
+
+    def __init__(self, filters, maxsize):
+        self.filters = filters
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def offer(self, event):
+        if not self.filters.matches(event):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET)
+
+
+class LocalBroker:
+    """
+    Fans events out to the listeners of this process. Publishing is safe
+    from any thread and costs one wake-up per event loop, not per listener.
+    """
+
+    def __init__(self):
+        self.listeners = {}
+        self.lock = threading.Lock()
+
+    def publish(self, events):
+        for event in events:
+            self.dispatch(event)
+
+    def dispatch(self, event):
+        with self.lock:
+            loops = list(self.listeners)
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self.deliver, loop, event)
+            except RuntimeError:
+                # Closed loop: its listeners are gone.
+                with self.lock:
+                    self.listeners.pop(loop, None)
+
+    def deliver(self, loop, event):
+        with self.lock:
+            subscriptions = list(self.listeners.get(loop, ()))
+        for subscription in subscriptions:
+            subscription.offer(event)
+
+    def subscribe(self, filters):
+        subscription = Subscription(filters, settings.SSE_QUEUE_SIZE)
+        with self.lock:
+            self.listeners.setdefault(subscription.loop, set()).add(subscription)
+        SSE_CONNECTIONS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.listeners.get(subscription.loop, set())
+            if subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.listeners[subscription.loop]
+        SSE_CONNECTIONS.dec()
+
+
+class RedisBroker(LocalBroker):
+    """
+    Publishes through Redis pub/sub so the listeners of every worker get the
+    events. Each process keeps a single subscriber connection per event loop
+    and fans out locally.
+    """
+
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+        self.client = redis.Redis.from_url(url)
+        self.readers = {}
+
+    def publish(self, events):
+        with self.client.pipeline(transaction=False) as pipeline:
+            for event in events:
+                pipeline.publish(CHANNEL, orjson.dumps(event))
+            pipeline.execute()
+
+    def subscribe(self, filters):
+        subscription = super().subscribe(filters)
+        reader = self.readers.get(subscription.loop)
+        if reader is None or reader.done():
+            self.readers[subscription.loop] = subscription.loop.create_task(
+                self.read(subscription.loop)
+            )
+        return subscription
+
+    async def read(self, loop):
+        while True:
+            client = redis.asyncio.Redis.from_url(self.url)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CHANNEL)
+                async for message in pubsub.listen():
+                    self.deliver(loop, orjson.loads(message["data"]))
+            except redis.RedisError:
+                logger.warning("Event subscription lost, reconnecting", exc_info=True)
+                self.deliver(loop, RESET)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+
+@functools.cache
+def get_broker():
+    if settings.SSE_BROKER == "redis":
+        return RedisBroker(settings.SSE_REDIS_URL)
+    return LocalBroker()
+
+
+def publish_events(events):
+    """
+    Publishes the events once the current transaction commits, so listeners
+    never see changes that are rolled back.
+    """
+    events = list(events)
+    if not events:
+        return
+
+    def _publish():
+        try:
+            get_broker().publish(events)
+        except redis.RedisError:
+            logger.warning("Could not publish %d events", len(events), exc_info=True)
+
+    transaction.on_commit(_publish)
+
+
+def _format(event):
+    name = event["type"].encode()
+    return b"event: " + name + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+
+async def event_stream(filters):
+    """
+    Server-sent events for one connection, with a comment line every
+    SSE_HEARTBEAT_SECONDS so proxies keep idle connections open. The
+    listener is registered once the response starts streaming and removed
+    when the client disconnects.
+    """
+    broker = get_broker()
+    subscription = broker.subscribe(filters)
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n".encode()
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), settings.SSE_HEARTBEAT_SECONDS
+                )
+            except TimeoutError:
+                yield b": ping\n\n"
+                continue
+            yield _format(event)
+    finally:
+        broker.unsubscribe(subscription)
@@ -1,6 +1,6 @@
 import django_filters
 
-from ads.models import Ad
+from ads.models import Ad, PublicAd
 
 
 class AdFilter(django_filters.FilterSet):
@@ -23,3 +23,21 @@ class AdFilter(django_filters.FilterSet):
             "product_sale_price__lte",
             "product_sale_price__gte",
         ]
+
+
+class PublicAdFilter(django_filters.FilterSet):
+    product_sale_price__lte = django_filters.NumberFilter(
+        field_name="product_sale_price", lookup_expr="lte"
+    )
+    product_sale_price__gte = django_filters.NumberFilter(
+        field_name="product_sale_price", lookup_expr="gte"
+    )
+
+    class Meta:
+        model = PublicAd
+        fields = [
+            "store",
+            "product",
+            "product_sale_price__lte",
+            "product_sale_price__gte",
+        ]
@@ -0,0 +1,157 @@
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from utils.cache_tags import invalidate_tags
+
+from .events import RESET, publish_events
+from .models import Ad, Category, Product, refresh_public_ads
+from .serializers import ProductImportSerializer
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+STOPPED = "importação interrompida."
+
+
+def read_csv_rows(stream):
+    """
+    Yields (line, row, error) for each CSV record. Empty cells count as not
+    given, so they keep the current value of an existing product.
+    """
+    reader = csv.DictReader(line.decode("utf-8-sig") for line in stream)
+    # The reader cannot resync after a malformed record, so the import stops
+    # there and reports what was read so far. DictReader.line_num only moves
+    # once a row is returned; the inner reader's count includes the bad line.
+    try:
+        for row in reader:
+            yield reader.line_num, {
+                key.strip(): value
+                for key, value in row.items()
+                if key and value not in (None, "")
+            }, None
+    except UnicodeDecodeError:
+        line = reader.reader.line_num + 1
+        yield line, None, f"Linha não está em UTF-8; {STOPPED}"
+    except csv.Error as exc:
+        yield reader.reader.line_num, None, f"CSV inválido ({exc}); {STOPPED}"
+
+
+def read_jsonl_rows(stream):
+    """
+    Yields (line, row, error) for each non-blank line of a JSON Lines body.
+    """
+    for number, raw in enumerate(stream, start=1):
+        try:
+            line = raw.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            yield number, None, "Linha não está em UTF-8."
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield number, None, "JSON inválido."
+            continue
+        if not isinstance(row, dict):
+            yield number, None, "Cada linha deve ser um objeto JSON."
+            continue
+        yield number, row, None
+
+
+def _pk(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class ProductImport:
+    """
+    Validates rows against ProductImportSerializer and upserts them by SKU in
+    chunks of BATCH_SIZE, so memory stays bounded whatever the body size.
+    Signals do not fire for bulk_create: the read model is refreshed per
+    chunk, and the caches are invalidated and event listeners told to
+    resync once, at the end.
+    """
+
+    def __init__(self):
+        self.context = {"categories": {}}
+        self.serializer = ProductImportSerializer(context=self.context)
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+
+    def run(self, rows):
+        rows = iter(rows)
+        try:
+            while chunk := list(islice(rows, BATCH_SIZE)):
+                self.import_chunk(chunk)
+        finally:
+            # Earlier chunks are already committed even if a later one fails.
+            if self.updated:
+                invalidate_tags("products", "ads:public-list")
+            if self.created or self.updated:
+                publish_events([RESET])
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": errors})
+
+    def import_chunk(self, chunk):
+        self.context["categories"] = Category.objects.in_bulk(
+            {_pk(row.get("category")) for _, row, _ in chunk if row} - {None}
+        )
+
+        by_sku = {}
+        for line, row, error in chunk:
+            if error:
+                self.add_error(line, {"non_field_errors": [error]})
+                continue
+            try:
+                attrs = self.serializer.run_validation(row)
+            except serializers.ValidationError as exc:
+                self.add_error(line, exc.detail)
+                continue
+            # A repeated SKU in the same chunk: the last row wins.
+            by_sku[attrs["sku"]] = attrs
+        if not by_sku:
+            return
+
+        # Rows are grouped by the columns they carry, so absent columns keep
+        # their current value instead of being reset to the model default.
+        groups = {}
+        for attrs in by_sku.values():
+            groups.setdefault(frozenset(attrs), []).append(Product(**attrs))
+
+        with transaction.atomic():
+            existing = set(
+                Product.objects.filter(sku__in=by_sku).values_list("sku", flat=True)
+            )
+            for fields, products in groups.items():
+                Product.objects.bulk_create(
+                    products,
+                    update_conflicts=True,
+                    unique_fields=["sku"],
+                    update_fields=[*sorted(fields - {"sku"}), "updated_at"],
+                )
+            if existing:
+                ads = Ad.objects.filter(product__sku__in=existing)
+                # Ad and PublicAd validators key off updated_at.
+                ads.update(updated_at=timezone.now())
+                refresh_public_ads(ads.values_list("id", flat=True))
+
+        self.created += len(by_sku) - len(existing)
+        self.updated += len(existing)
@@ -0,0 +1,44 @@
+# Generated by Django 6.0 on 2026-10-17 11:29
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0009_full_text_search"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"],
+                name="ads_product_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="store",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="ads_store_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="store",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["city"], name="ads_store_city_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="store",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["state"],
+                name="ads_store_state_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
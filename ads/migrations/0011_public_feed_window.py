@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-17 11:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0010_trigram_search"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(("active", True), ("published", True)),
+                fields=["-created_at", "id"],
+                name="ads_ad_public_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(("active", True), ("published", True)),
+                fields=["start_date"],
+                name="ads_ad_public_start_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(
+                condition=models.Q(("active", True), ("published", True)),
+                fields=["end_date"],
+                name="ads_ad_public_end_idx",
+            ),
+        ),
+    ]
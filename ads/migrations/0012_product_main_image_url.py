@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-17 11:45
+
+from django.db import migrations, models
+
+
+def fill_main_image_url(apps, schema_editor):
+    Product = apps.get_model("ads", "Product")
+    ProductImage = apps.get_model("ads", "ProductImage")
+    images = ProductImage.objects.filter(is_main=True, product__isnull=False)
+    for image in images.only("product_id", "image").iterator():
+        Product.objects.filter(pk=image.product_id).update(
+            main_image_url=image.image.url
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0011_public_feed_window"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="main_image_url",
+            field=models.URLField(
+                blank=True, editable=False, max_length=500, null=True
+            ),
+        ),
+        migrations.RunPython(fill_main_image_url, migrations.RunPython.noop),
+    ]
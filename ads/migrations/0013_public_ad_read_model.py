@@ -0,0 +1,116 @@
+# Generated by Django 6.0 on 2026-10-17 11:49
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+FILL_PUBLIC_ADS = """
+INSERT INTO ads_publicad (
+    id, title, description, store_id, product_id, product_name,
+    product_sale_price, product_main_image_url, start_date, end_date,
+    created_at, updated_at
+)
+SELECT
+    ad.id, ad.title, ad.description, ad.store_id, ad.product_id, product.name,
+    product.sale_price, product.main_image_url, ad.start_date, ad.end_date,
+    ad.created_at, ad.updated_at
+FROM ads_ad ad
+LEFT JOIN ads_product product ON product.id = ad.product_id
+WHERE ad.active AND ad.published
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0012_product_main_image_url"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PublicAd",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("title", models.CharField(max_length=100)),
+                ("description", models.TextField(blank=True, null=True)),
+                (
+                    "product_name",
+                    models.CharField(blank=True, max_length=100, null=True),
+                ),
+                (
+                    "product_sale_price",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=10, null=True
+                    ),
+                ),
+                (
+                    "product_main_image_url",
+                    models.URLField(blank=True, max_length=500, null=True),
+                ),
+                ("start_date", models.DateTimeField(blank=True, null=True)),
+                ("end_date", models.DateTimeField(blank=True, null=True)),
+                (
+                    "search_vector",
+                    models.GeneratedField(
+                        db_persist=True,
+                        expression=django.contrib.postgres.search.CombinedSearchVector(
+                            django.contrib.postgres.search.SearchVector(
+                                "title", config="portuguese", weight="A"
+                            ),
+                            "||",
+                            django.contrib.postgres.search.SearchVector(
+                                "description", config="portuguese", weight="B"
+                            ),
+                            django.contrib.postgres.search.SearchConfig("portuguese"),
+                        ),
+                        output_field=django.contrib.postgres.search.SearchVectorField(),
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField()),
+                (
+                    "product",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="ads.product",
+                    ),
+                ),
+                (
+                    "store",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="ads.store",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["-created_at", "id"], name="ads_publicad_created_idx"
+                    ),
+                    models.Index(
+                        fields=["product_sale_price"],
+                        name="ads_publica_product_4f2673_idx",
+                    ),
+                    models.Index(
+                        fields=["start_date"], name="ads_publica_start_d_ab0be2_idx"
+                    ),
+                    models.Index(
+                        fields=["end_date"], name="ads_publica_end_dat_2a098e_idx"
+                    ),
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["search_vector"], name="ads_publicad_search_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.RunSQL(FILL_PUBLIC_ADS, migrations.RunSQL.noop),
+    ]
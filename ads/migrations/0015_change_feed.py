@@ -0,0 +1,60 @@
+# Generated by Django 6.0 on 2026-10-17 12:38
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0014_product_sku"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("resource", models.CharField(max_length=50)),
+                ("object_id", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="ad",
+            index=models.Index(fields=["updated_at", "id"], name="ads_ad_changes_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(
+                fields=["updated_at", "id"], name="ads_category_changes_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["updated_at", "id"], name="ads_product_changes_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="store",
+            index=models.Index(
+                fields=["updated_at", "id"], name="ads_store_changes_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["resource", "deleted_at", "object_id"],
+                name="ads_tombstone_changes_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-17 13:57
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0015_change_feed"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="ad",
+            name="ads_ad_public_created_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ad",
+            name="ads_ad_public_start_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ad",
+            name="ads_ad_public_end_idx",
+        ),
+    ]
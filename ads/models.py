@@ -1,5 +1,65 @@
 from cloudinary_storage.storage import MediaCloudinaryStorage
-from django.db import models
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import models, transaction
+from django.db.models import Min, Q
+from django.utils import timezone
+
+
+class SearchVectorManager(models.Manager):
+    # The tsvector is only read by the database, never by Python.
+    def get_queryset(self):
+        return super().get_queryset().defer("search_vector")
+
+
+def weighted_search_vector(*fields):
+    vector = None
+    for field, weight in fields:
+        part = SearchVector(
+            field, weight=weight, config=settings.FULL_TEXT_SEARCH_CONFIG
+        )
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def scheduled_window(now):
+    """
+    Condition of the rows whose start_date/end_date window contains ``now``.
+    """
+    return (Q(start_date__isnull=True) | Q(start_date__lte=now)) & (
+        Q(end_date__isnull=True) | Q(end_date__gt=now)
+    )
+
+
+class ScheduledQuerySet(models.QuerySet):
+    def scheduled(self, now=None):
+        """
+        Rows whose start_date/end_date window contains ``now``.
+        """
+        return self.filter(scheduled_window(now or timezone.now()))
+
+    def next_boundary(self, now=None):
+        """
+        The next start_date or end_date after ``now``, or None.
+        """
+        now = now or timezone.now()
+        boundaries = [
+            self.filter(start_date__gt=now).aggregate(next=Min("start_date")),
+            self.filter(end_date__gt=now).aggregate(next=Min("end_date")),
+        ]
+        return min(
+            (boundary["next"] for boundary in boundaries if boundary["next"]),
+            default=None,
+        )
+
+
+class AdQuerySet(ScheduledQuerySet):
+    def public(self, now=None):
+        """
+        Active, published ads whose scheduling window contains ``now``.
+        """
+        return self.filter(active=True, published=True).scheduled(now)
 
 
 class Category(models.Model):
@@ -22,6 +82,7 @@ class Category(models.Model):
         indexes = [
             models.Index(fields=["name"]),
             models.Index(fields=["active"]),
+            models.Index(fields=["updated_at", "id"], name="ads_category_changes_idx"),
         ]
 
     def __str__(self):
@@ -59,8 +120,17 @@ class ProductImage(models.Model):
             )
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Kept to resync the previous product when an image is moved.
+        instance._loaded_product_id = instance.__dict__.get("product_id")
+        return instance
+
 
 class Product(models.Model):
+    # Supplier/catalog code, the natural key of the bulk import.
+    sku = models.CharField(max_length=64, unique=True, blank=True, null=True)
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
     active = models.BooleanField(default=True)
@@ -81,9 +151,22 @@ class Product(models.Model):
     cost_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     sale_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
+    # URL of the is_main ProductImage, kept by sync_main_image_url().
+    main_image_url = models.URLField(
+        max_length=500, blank=True, null=True, editable=False
+    )
+
+    search_vector = models.GeneratedField(
+        expression=weighted_search_vector(("name", "A"), ("description", "B")),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SearchVectorManager()
+
     class Meta:
         ordering = ["name"]
         indexes = [
@@ -93,12 +176,61 @@ class Product(models.Model):
             models.Index(fields=["stock"]),
             models.Index(fields=["cost_price"]),
             models.Index(fields=["sale_price"]),
+            models.Index(fields=["updated_at", "id"], name="ads_product_changes_idx"),
             models.Index(fields=["active", "category"]),
+            models.Index(fields=["name", "id"]),
+            GinIndex(fields=["search_vector"], name="ads_product_search_idx"),
+            GinIndex(
+                fields=["name"],
+                opclasses=["gin_trgm_ops"],
+                name="ads_product_name_trgm",
+            ),
         ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # Never write main_image_url back from a possibly stale instance.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and not field.generated
+                and field.name != "main_image_url"
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Kept to announce price changes (see ads.events).
+        instance._loaded_sale_price = instance.__dict__.get("sale_price")
+        return instance
+
+
+def sync_main_image_url(product_id):
+    """
+    Copies the URL of the product's main image onto the product row and
+    bumps its ads, which embed it, for the change feeds. The product row is
+    locked so concurrent image writes apply one at a time.
+    """
+    with transaction.atomic():
+        if not Product.objects.select_for_update().filter(pk=product_id).exists():
+            return
+        image = (
+            ProductImage.objects.filter(product_id=product_id, is_main=True)
+            .only("image")
+            .first()
+        )
+        url = image.image.url if image and image.image else None
+        now = timezone.now()
+        Product.objects.filter(pk=product_id).update(main_image_url=url, updated_at=now)
+        Ad.objects.filter(product_id=product_id).update(updated_at=now)
+
 
 class Store(models.Model):
     name = models.CharField(max_length=150)
@@ -124,6 +256,18 @@ class Store(models.Model):
             models.Index(fields=["state"]),
             models.Index(fields=["active", "city", "state"]),
             models.Index(fields=["created_at"]),
+            models.Index(fields=["updated_at", "id"], name="ads_store_changes_idx"),
+            GinIndex(
+                fields=["name"], opclasses=["gin_trgm_ops"], name="ads_store_name_trgm"
+            ),
+            GinIndex(
+                fields=["city"], opclasses=["gin_trgm_ops"], name="ads_store_city_trgm"
+            ),
+            GinIndex(
+                fields=["state"],
+                opclasses=["gin_trgm_ops"],
+                name="ads_store_state_trgm",
+            ),
         ]
 
     def __str__(self):
@@ -148,9 +292,17 @@ class Ad(models.Model):
     end_date = models.DateTimeField(blank=True, null=True)
     slug = models.SlugField(max_length=120, unique=True, blank=True, null=True)
 
+    search_vector = models.GeneratedField(
+        expression=weighted_search_vector(("title", "A"), ("description", "B")),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SearchVectorManager.from_queryset(AdQuerySet)()
+
     class Meta:
         indexes = [
             models.Index(fields=["active"]),
@@ -159,12 +311,171 @@ class Ad(models.Model):
             models.Index(fields=["product"]),
             models.Index(fields=["created_at"]),
             models.Index(fields=["active", "published"]),
+            models.Index(fields=["-created_at", "id"], name="ads_ad_created_id_idx"),
+            models.Index(fields=["updated_at", "id"], name="ads_ad_changes_idx"),
+            GinIndex(fields=["search_vector"], name="ads_ad_search_idx"),
         ]
         ordering = ["-created_at"]
 
     def __str__(self):
         return self.title
 
+    def is_public(self, now=None):
+        """
+        Whether ``Ad.objects.public(now)`` includes this ad.
+        """
+        now = now or timezone.now()
+        return (
+            self.active
+            and self.published
+            and (self.start_date is None or self.start_date <= now)
+            and (self.end_date is None or self.end_date > now)
+        )
+
+
+class PublicAd(models.Model):
+    """
+    Read model of the public ad feed: one row per active, published ad with
+    the product columns the list renders and filters on. Kept in sync by
+    refresh_public_ads() from ads/signals.py; the scheduling window is still
+    applied at read time with ``scheduled()``.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=100)
+    description = models.TextField(blank=True, null=True)
+
+    store = models.ForeignKey(
+        "Store",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        null=True,
+    )
+    product = models.ForeignKey(
+        "Product",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+        null=True,
+    )
+    product_name = models.CharField(max_length=100, blank=True, null=True)
+    product_sale_price = models.DecimalField(
+        max_digits=10, decimal_places=2, blank=True, null=True
+    )
+    product_main_image_url = models.URLField(max_length=500, blank=True, null=True)
+
+    start_date = models.DateTimeField(blank=True, null=True)
+    end_date = models.DateTimeField(blank=True, null=True)
+
+    search_vector = models.GeneratedField(
+        expression=weighted_search_vector(("title", "A"), ("description", "B")),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    # Only active, published ads have a row.
+    active = True
+    published = True
+
+    objects = SearchVectorManager.from_queryset(ScheduledQuerySet)()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="ads_publicad_created_idx"),
+            models.Index(fields=["product_sale_price"]),
+            models.Index(fields=["start_date"]),
+            models.Index(fields=["end_date"]),
+            GinIndex(fields=["search_vector"], name="ads_publicad_search_idx"),
+        ]
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return self.title
+
+
+def refresh_public_ads(ad_ids):
+    """
+    Upserts the PublicAd rows of the given ads and drops those that are no
+    longer active and published (or no longer exist).
+    """
+    ad_ids = set(ad_ids)
+    if not ad_ids:
+        return
+    ads = (
+        Ad.objects.filter(id__in=ad_ids, active=True, published=True)
+        .select_related("product")
+        .only(
+            "id",
+            "title",
+            "description",
+            "store",
+            "start_date",
+            "end_date",
+            "created_at",
+            "updated_at",
+            "product",
+            "product__name",
+            "product__sale_price",
+            "product__main_image_url",
+        )
+    )
+    rows = [
+        PublicAd(
+            id=ad.id,
+            title=ad.title,
+            description=ad.description,
+            store_id=ad.store_id,
+            product_id=ad.product_id,
+            product_name=ad.product.name if ad.product else None,
+            product_sale_price=ad.product.sale_price if ad.product else None,
+            product_main_image_url=ad.product.main_image_url if ad.product else None,
+            start_date=ad.start_date,
+            end_date=ad.end_date,
+            created_at=ad.created_at,
+            updated_at=ad.updated_at,
+        )
+        for ad in ads
+    ]
+    with transaction.atomic():
+        PublicAd.objects.filter(id__in=ad_ids - {row.id for row in rows}).delete()
+        PublicAd.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["id"],
+            update_fields=[
+                field.name
+                for field in PublicAd._meta.concrete_fields
+                if not field.primary_key and not field.generated
+            ],
+        )
+
+
+class Tombstone(models.Model):
+    """
+    A deleted catalog row, kept so the change feeds can tell clients to drop
+    it. ``resource`` is the model label, e.g. "ads.ad". Pruned after
+    CHANGE_FEED_TOMBSTONE_DAYS by ``manage.py prune_tombstones``.
+    """
+
+    resource = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["resource", "deleted_at", "object_id"],
+                name="ads_tombstone_changes_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.resource} {self.object_id}"
+
 
 class Favorite(models.Model):
     user = models.ForeignKey(
@@ -184,6 +495,9 @@ class Favorite(models.Model):
         indexes = [
             models.Index(fields=["user", "product"], name="idx_user_product"),
             models.Index(fields=["created_at"], name="idx_created_at"),
+            models.Index(
+                fields=["user", "-created_at", "id"], name="idx_user_created_id"
+            ),
         ]
         ordering = ["-created_at"]
 
@@ -1,6 +1,26 @@
 from rest_framework import serializers
 
-from .models import Ad, Category, Favorite, Product, ProductImage, Store
+from utils.fast_serializers import FastListSerializer
+from utils.sparse_fields import SparseFieldsMixin
+
+from .models import Ad, Category, Favorite, Product, ProductImage, PublicAd, Store
+
+
+class StaffOnlyFieldsMixin:
+    """
+    Leaves ``staff_only_fields`` out of the serializer unless the request user
+    is staff.
+    """
+
+    staff_only_fields = ()
+
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get("request")
+        if request and not (request.user and request.user.is_staff):
+            for name in self.staff_only_fields:
+                fields.pop(name, None)
+        return fields
 
 
 # Categories
@@ -10,7 +30,7 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class CategorySimpleSerializer(serializers.ModelSerializer):
+class CategorySimpleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ("id", "name", "image")
@@ -23,11 +43,17 @@ class ProductImageSerializer(serializers.ModelSerializer):
         fields = ("id", "image", "is_main")
 
 
-class ProductListSerializer(serializers.ModelSerializer):
+class ProductListSerializer(
+    StaffOnlyFieldsMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     category = CategorySimpleSerializer(read_only=True)
+    main_image = serializers.CharField(source="main_image_url", read_only=True)
+
+    staff_only_fields = ("cost_price",)
 
     class Meta:
         model = Product
+        list_serializer_class = FastListSerializer
         fields = (
             "id",
             "name",
@@ -35,26 +61,25 @@ class ProductListSerializer(serializers.ModelSerializer):
             "description",
             "category",
             "image",
+            "main_image",
             "stock",
             "cost_price",
             "sale_price",
         )
 
-    def to_representation(self, instance):
-        rep = super().to_representation(instance)
-        request = self.context.get("request")
-        if request and not (request.user and request.user.is_staff):
-            rep.pop("cost_price", None)
-        return rep
 
-
-class ProductDetailSerializer(serializers.ModelSerializer):
+class ProductDetailSerializer(
+    StaffOnlyFieldsMixin, SparseFieldsMixin, serializers.ModelSerializer
+):
     category = CategorySimpleSerializer(read_only=True)
 
+    staff_only_fields = ("cost_price",)
+
     class Meta:
         model = Product
         fields = (
             "id",
+            "sku",
             "name",
             "description",
             "active",
@@ -67,19 +92,13 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             "updated_at",
         )
 
-    def to_representation(self, instance):
-        rep = super().to_representation(instance)
-        request = self.context.get("request")
-        if request and not (request.user and request.user.is_staff):
-            rep.pop("cost_price", None)
-        return rep
-
 
 class ProductCreateUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = (
             "id",
+            "sku",
             "name",
             "description",
             "active",
@@ -91,6 +110,43 @@ class ProductCreateUpdateSerializer(serializers.ModelSerializer):
         )
 
 
+class PreloadedCategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves the pk from context["categories"], loaded once per import chunk,
+    instead of one query per row.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        category = self.context["categories"].get(pk)
+        if category is None:
+            self.fail("does_not_exist", pk_value=data)
+        return category
+
+
+class ProductImportSerializer(ProductCreateUpdateSerializer):
+    # No UniqueValidator: rows with a known SKU update that product.
+    sku = serializers.CharField(max_length=64)
+    category = PreloadedCategoryField(queryset=Category.objects.all())
+
+    class Meta(ProductCreateUpdateSerializer.Meta):
+        fields = (
+            "sku",
+            "name",
+            "description",
+            "active",
+            "category",
+            "stock",
+            "cost_price",
+            "sale_price",
+        )
+
+
 class ProductImageCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductImage
@@ -110,21 +166,18 @@ class ProductImageCreateSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class ProductSimpleWithMainImageSerializer(serializers.ModelSerializer):
-    main_image = serializers.SerializerMethodField()
+class ProductSimpleWithMainImageSerializer(
+    SparseFieldsMixin, serializers.ModelSerializer
+):
+    main_image = serializers.CharField(source="main_image_url", read_only=True)
 
     class Meta:
         model = Product
         fields = ["id", "name", "sale_price", "main_image"]
 
-    def get_main_image(self, obj):
-        if hasattr(obj, "main_image") and obj.main_image:
-            return obj.main_image[0].image.url
-        return None
-
 
 # Stores
-class StoreSerializer(serializers.ModelSerializer):
+class StoreSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Store
         fields = "__all__"
@@ -133,11 +186,12 @@ class StoreSerializer(serializers.ModelSerializer):
 # ADS
 
 
-class AdSerializer(serializers.ModelSerializer):
+class AdSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     product = ProductSimpleWithMainImageSerializer(read_only=True)
 
     class Meta:
         model = Ad
+        list_serializer_class = FastListSerializer
         fields = [
             "id",
             "title",
@@ -151,19 +205,92 @@ class AdSerializer(serializers.ModelSerializer):
         ]
 
 
-class AdDetailSerializer(serializers.ModelSerializer):
+class PublicAdProductSerializer(SparseFieldsMixin, serializers.Serializer):
+    id = serializers.IntegerField(source="product_id")
+    name = serializers.CharField(source="product_name")
+    sale_price = serializers.DecimalField(
+        source="product_sale_price", max_digits=10, decimal_places=2
+    )
+    main_image = serializers.CharField(source="product_main_image_url")
+
+    def get_attribute(self, instance):
+        # source="*": an ad without product renders as "product": null.
+        if instance.product_id is None:
+            return None
+        return instance
+
+
+class PublicAdSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Renders a PublicAd row with the same shape as AdSerializer.
+    """
+
+    active = serializers.BooleanField(read_only=True)
+    published = serializers.BooleanField(read_only=True)
+    product = PublicAdProductSerializer(source="*", read_only=True)
+
+    class Meta:
+        model = PublicAd
+        list_serializer_class = FastListSerializer
+        fields = [
+            "id",
+            "title",
+            "description",
+            "active",
+            "published",
+            "store",
+            "product",
+            "created_at",
+            "updated_at",
+        ]
+
+
+class AdDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     product = ProductDetailSerializer(read_only=True)
 
     class Meta:
         model = Ad
-        fields = "__all__"
+        exclude = ["search_vector"]
         read_only_fields = ["id", "created_at", "updated_at"]
 
 
+class AdBulkUpdateSerializer(serializers.Serializer):
+    """
+    Selects ads by ``ids`` or by an AdFilter expression in ``filter`` and
+    carries the state changes to apply to all of them.
+    """
+
+    CHANGE_FIELDS = ("active", "published", "start_date", "end_date")
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False
+    )
+    filter = serializers.DictField(required=False, allow_empty=False)
+    active = serializers.BooleanField(required=False)
+    published = serializers.BooleanField(required=False)
+    start_date = serializers.DateTimeField(required=False, allow_null=True)
+    end_date = serializers.DateTimeField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Informe ids ou filter, não ambos.")
+        if not any(field in attrs for field in self.CHANGE_FIELDS):
+            raise serializers.ValidationError("Nenhuma alteração informada.")
+        return attrs
+
+    @property
+    def changes(self):
+        return {
+            field: self.validated_data[field]
+            for field in self.CHANGE_FIELDS
+            if field in self.validated_data
+        }
+
+
 # Favorites
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
+class FavoriteSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     product = ProductListSerializer(read_only=True)
     product_id = serializers.PrimaryKeyRelatedField(
         queryset=Product.objects.all(), source="product", write_only=True
@@ -171,6 +298,7 @@ class FavoriteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Favorite
+        list_serializer_class = FastListSerializer
         fields = ["id", "user", "product", "product_id", "created_at"]
         read_only_fields = ["user", "created_at"]
 
@@ -1,17 +1,144 @@
 # ads/signals.py
-from django.core.cache import cache
-from django.db.models.signals import post_delete, post_save
+from decimal import Decimal
+
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
+from django.utils import timezone
+
+from utils.cache_tags import invalidate_tags_on_commit
+
+from .events import ad_event, price_event, product_event, publish_events
+from .models import (
+    Ad,
+    Category,
+    Favorite,
+    Product,
+    ProductImage,
+    PublicAd,
+    Store,
+    Tombstone,
+    refresh_public_ads,
+    sync_main_image_url,
+)
+
 
-from .models import Ad, Favorite, ProductImage
+def refresh_public_ads_for(**lookup):
+    # Rows already in the read model too: SET_NULL cascades skip Ad signals.
+    ids = set(Ad.objects.filter(**lookup).values_list("id", flat=True))
+    ids.update(PublicAd.objects.filter(**lookup).values_list("id", flat=True))
+    refresh_public_ads(ids)
 
 
 @receiver([post_save, post_delete], sender=Ad)
+def clear_ads_cache(sender, instance, **kwargs):
+    refresh_public_ads([instance.pk])
+    invalidate_tags_on_commit("ads:public-list", f"ad:{instance.pk}")
+
+
+def touch_ads(**lookup):
+    # .update() skips Ad signals; bumping updated_at makes the change feed
+    # resend ads whose embedded product or store changed.
+    Ad.objects.filter(**lookup).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=Product)
+def clear_product_cache(sender, instance, signal, **kwargs):
+    if signal is post_save:
+        touch_ads(product=instance.pk)
+    refresh_public_ads_for(product=instance.pk)
+    invalidate_tags_on_commit(f"product:{instance.pk}")
+
+
+@receiver(post_save, sender=Category)
+def touch_category_products(sender, instance, created=False, **kwargs):
+    # Products embed their category in the change feed.
+    if not created:
+        Product.objects.filter(category=instance.pk).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=Category)
+def clear_category_cache(sender, instance, **kwargs):
+    invalidate_tags_on_commit(f"category:{instance.pk}")
+
+
 @receiver([post_save, post_delete], sender=ProductImage)
-def clear_ads_cache(sender, **kwargs):
-    cache.delete_pattern("views.decorators.cache.cache_*")
+def clear_product_image_cache(sender, instance, **kwargs):
+    # An image moved to another product changes both.
+    product_ids = {instance.product_id, getattr(instance, "_loaded_product_id", None)}
+    product_ids.discard(None)
+    instance._loaded_product_id = instance.product_id
+    if not product_ids:
+        return
+    for product_id in sorted(product_ids):
+        sync_main_image_url(product_id)
+    refresh_public_ads_for(product__in=product_ids)
+    invalidate_tags_on_commit(*(f"product:{pk}" for pk in sorted(product_ids)))
+
+
+@receiver([post_save, post_delete], sender=Store)
+def clear_store_cache(sender, instance, **kwargs):
+    invalidate_tags_on_commit(f"store:{instance.pk}")
+
+
+@receiver(post_delete, sender=Store)
+def detach_deleted_store(sender, instance, **kwargs):
+    refresh_public_ads_for(store=instance.pk)
 
 
 @receiver([post_save, post_delete], sender=Favorite)
-def clear_favorites_cache(sender, **kwargs):
-    cache.delete_pattern("views.decorators.cache.cache_*")
+def clear_favorites_cache(sender, instance, **kwargs):
+    invalidate_tags_on_commit(f"favorites:user:{instance.user_id}")
+
+
+@receiver(post_delete, sender=Ad)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Store)
+@receiver(post_delete, sender=Category)
+def record_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(resource=sender._meta.label_lower, object_id=instance.pk)
+
+
+@receiver(pre_delete, sender=Product)
+@receiver(pre_delete, sender=Store)
+def touch_detached_ads(sender, instance, **kwargs):
+    # SET_NULL runs as a plain UPDATE; resend the ads without the deleted
+    # product/store.
+    field = "product" if sender is Product else "store"
+    touch_ads(**{field: instance.pk})
+
+
+def ad_category_id(ad):
+    if not ad.product_id:
+        return None
+    if Ad.product.is_cached(ad):
+        return ad.product.category_id
+    return (
+        Product.objects.filter(pk=ad.product_id)
+        .values_list("category_id", flat=True)
+        .first()
+    )
+
+
+@receiver([post_save, post_delete], sender=Ad)
+def publish_ad_event(sender, instance, signal, **kwargs):
+    # The stream is anonymous: ads that are not public are only announced
+    # as removed.
+    public = signal is post_save and instance.is_public()
+    action = "saved" if public else "deleted"
+    publish_events(
+        [ad_event(instance.pk, instance.store_id, ad_category_id(instance), action)]
+    )
+
+
+@receiver([post_save, post_delete], sender=Product)
+def publish_product_event(sender, instance, signal, created=False, **kwargs):
+    if signal is post_delete or not instance.active:
+        publish_events([product_event(instance, "deleted")])
+        return
+    events = [product_event(instance)]
+    previous = getattr(instance, "_loaded_sale_price", None)
+    if not created and previous is not None:
+        if Decimal(str(previous)) != Decimal(str(instance.sale_price)):
+            events.append(price_event(instance, previous))
+    instance._loaded_sale_price = instance.sale_price
+    publish_events(events)
@@ -1,5 +1,6 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
 User = get_user_model()
@@ -44,6 +45,18 @@ def mock_cloudinary(mocker):
         "cloudinary_storage.storage.MediaCloudinaryStorage._save",
         return_value="fake_image.jpg",
     )
+    mocker.patch(
+        "cloudinary_storage.storage.MediaCloudinaryStorage.url",
+        side_effect=lambda name: f"https://res.cloudinary.com/test/{name}",
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Invalidações só rodam no commit: entradas de testes anteriores não caem
+    """
+    cache.clear()
 
 
 @pytest.fixture
@@ -7,6 +7,7 @@ from ads.models import (
     Ad,
     Category,
     Product,
+    PublicAd,
     Store,
 )
 
@@ -260,6 +261,26 @@ class TestAdPublicAPI:
         assert len(results) == 1
         assert results[0]["title"] == "Ativo Publicado"
 
+    def test_public_list_respects_schedule_window(self, client, ad_factory):
+        now = timezone.now()
+        ad_factory(title="Sem agenda")
+        ad_factory(title="Em andamento", start_date=now - timezone.timedelta(days=1))
+        ad_factory(title="Expirado", end_date=now - timezone.timedelta(minutes=1))
+        ad_factory(title="Futuro", start_date=now + timezone.timedelta(days=1))
+
+        response = client.get(reverse("ad_public_list"))
+        titles = {item["title"] for item in response.data["results"]}
+
+        assert titles == {"Sem agenda", "Em andamento"}
+
+    def test_public_detail_hides_expired_ad(self, client, ad_factory):
+        ad = ad_factory(
+            title="Expirado", end_date=timezone.now() - timezone.timedelta(minutes=1)
+        )
+
+        response = client.get(reverse("ad_public_detail", args=[ad.id]))
+        assert response.status_code == 404
+
     def test_public_list_main_image_only(self, client, ad_factory, product):
         ad_factory(title="Ad com Imagem", active=True, published=True)
         product.images.create(image="test_image.jpg", is_main=True)
@@ -310,3 +331,236 @@ class TestAdPublicAPI:
 
         assert response_list.status_code == 200
         assert response_detail.status_code == 200
+
+
+@pytest.mark.django_db
+class TestAdMainImageQueries:
+
+    @pytest.fixture
+    def category(self):
+        return Category.objects.create(name="Eletrônicos", active=True)
+
+    @pytest.fixture
+    def store(self):
+        return Store.objects.create(name="Loja Teste")
+
+    @pytest.fixture
+    def ad_factory(self, category, store):
+        def create_ads(count):
+            for index in range(count):
+                product = Product.objects.create(
+                    name=f"Produto {index}", category=category, sale_price=10
+                )
+                product.images.create(image=f"main_{index}.jpg", is_main=True)
+                product.images.create(image=f"extra_{index}.jpg", is_main=False)
+                Ad.objects.create(title=f"Ad {index}", store=store, product=product)
+
+        return create_ads
+
+    def _count_queries(self, client, url):
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(context.captured_queries), response.data["results"]
+
+    def test_public_list_returns_main_image(self, client, ad_factory):
+        ad_factory(1)
+        _, results = self._count_queries(client, reverse("ad_public_list"))
+        assert results[0]["product"]["main_image"].endswith("main_0.jpg")
+
+    def test_public_list_query_count_is_constant(self, client, ad_factory):
+        ad_factory(2)
+        small, _ = self._count_queries(client, reverse("ad_public_list"))
+        ad_factory(8)
+        large, results = self._count_queries(client, reverse("ad_public_list"))
+
+        assert len(results) == 10
+        assert large == small
+
+    def test_admin_list_query_count_is_constant(self, admin_client, ad_factory):
+        ad_factory(2)
+        small, _ = self._count_queries(admin_client, reverse("ads_list"))
+        ad_factory(8)
+        large, results = self._count_queries(admin_client, reverse("ads_list"))
+
+        assert len(results) == 10
+        assert large == small
+        assert all(ad["product"]["main_image"] for ad in results)
+
+
+@pytest.mark.django_db
+class TestPublicAdReadModel:
+
+    @pytest.fixture
+    def category(self):
+        return Category.objects.create(name="Eletrônicos", active=True)
+
+    @pytest.fixture
+    def store(self):
+        return Store.objects.create(name="Loja Teste")
+
+    @pytest.fixture
+    def product(self, category):
+        return Product.objects.create(
+            name="Produto Teste", category=category, sale_price=200
+        )
+
+    @pytest.fixture
+    def ad(self, store, product):
+        return Ad.objects.create(title="Ad Público", store=store, product=product)
+
+    def test_row_follows_ad_visibility(self, ad):
+        assert PublicAd.objects.filter(id=ad.id).exists()
+
+        ad.published = False
+        ad.save()
+        assert not PublicAd.objects.filter(id=ad.id).exists()
+
+        ad.published = True
+        ad.save()
+        ad.delete()
+        assert not PublicAd.objects.exists()
+
+    def test_product_changes_are_copied(self, ad, product):
+        product.name = "Produto Renomeado"
+        product.sale_price = 150
+        product.save()
+        product.images.create(image="main.jpg", is_main=True)
+
+        row = PublicAd.objects.get(id=ad.id)
+        assert row.product_name == "Produto Renomeado"
+        assert row.product_sale_price == 150
+        assert row.product_main_image_url.endswith("main.jpg")
+
+    def test_deleted_product_and_store_are_detached(self, client, ad, product, store):
+        product.delete()
+        store.delete()
+
+        result = client.get(reverse("ad_public_list")).data["results"][0]
+        assert result["product"] is None
+        assert result["store"] is None
+
+    def test_list_filters_by_sale_price(self, client, ad, category):
+        cheap = Product.objects.create(name="Barato", category=category, sale_price=10)
+        Ad.objects.create(title="Ad Barato", product=cheap)
+
+        response = client.get(
+            reverse("ad_public_list"), {"product_sale_price__lte": "50"}
+        )
+        assert [item["title"] for item in response.data["results"]] == ["Ad Barato"]
+
+    def test_list_reads_only_the_read_model(self, client, ad):
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(reverse("ad_public_list"))
+
+        assert response.data["results"][0]["product"]["name"] == "Produto Teste"
+        assert not any(
+            '"ads_ad"' in query["sql"] or '"ads_product"' in query["sql"]
+            for query in context.captured_queries
+        )
+
+
+@pytest.mark.django_db
+class TestAdBulkUpdate:
+
+    @pytest.fixture
+    def store(self):
+        return Store.objects.create(name="Loja Teste")
+
+    @pytest.fixture
+    def ads(self, store):
+        category = Category.objects.create(name="Eletrônicos")
+        product = Product.objects.create(name="Mouse", category=category)
+        other = Store.objects.create(name="Outra Loja")
+        return [
+            Ad.objects.create(title=f"Ad {index}", store=store, product=product)
+            for index in range(3)
+        ] + [Ad.objects.create(title="Outra", store=other, product=product)]
+
+    def _patch(self, client, payload):
+        return client.patch(reverse("ads_bulk_update"), payload, format="json")
+
+    def test_updates_ids_in_one_statement(self, admin_client, ads):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        ids = [ad.id for ad in ads[:2]]
+        with CaptureQueriesContext(connection) as context:
+            response = self._patch(admin_client, {"ids": ids, "published": False})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"updated": 2}
+        updates = [
+            query
+            for query in context.captured_queries
+            if query["sql"].startswith('UPDATE "ads_ad"')
+        ]
+        assert len(updates) == 1
+        assert set(Ad.objects.filter(published=False).values_list("id", flat=True)) == (
+            set(ids)
+        )
+
+    def test_updates_by_filter_and_syncs_public_list(self, admin_client, ads, store):
+        end_date = timezone.now() + timezone.timedelta(days=1)
+
+        response = self._patch(
+            admin_client,
+            {"filter": {"store": store.id}, "active": False, "end_date": end_date},
+        )
+
+        assert response.data == {"updated": 3}
+        assert list(PublicAd.objects.values_list("id", flat=True)) == [ads[3].id]
+        assert not Ad.objects.filter(store=store, active=True).exists()
+        assert Ad.objects.filter(end_date=end_date).count() == 3
+
+    def test_invalidates_cached_public_list(self, admin_client, api_client, ads):
+        from django.core.cache import cache
+
+        cache.clear()
+        assert api_client.get(reverse("ad_public_list")).data["count"] == 4
+
+        self._patch(admin_client, {"ids": [ads[0].id], "published": False})
+
+        assert api_client.get(reverse("ad_public_list")).data["count"] == 3
+
+    def test_rejects_unknown_filters(self, admin_client, ads):
+        response = self._patch(
+            admin_client, {"filter": {"loja": 1}, "published": False}
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Ad.objects.filter(published=False).count() == 0
+
+    @pytest.mark.parametrize(
+        "filters", [{"store": ""}, {"store": "", "active": "", "start_date": None}]
+    )
+    def test_rejects_blank_filters(self, admin_client, ads, filters):
+        response = self._patch(admin_client, {"filter": filters, "active": False})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not Ad.objects.filter(active=False).exists()
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"published": False},
+            {"ids": [1], "filter": {"store": 1}, "published": False},
+            {"ids": [1]},
+        ],
+    )
+    def test_requires_selection_and_changes(self, admin_client, payload):
+        response = self._patch(admin_client, payload)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_non_staff_cannot_bulk_update(self, user_client, ads):
+        response = self._patch(user_client, {"ids": [ads[0].id], "active": False})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
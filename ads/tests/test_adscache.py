@@ -1,5 +1,8 @@
+from datetime import timedelta
+
 import pytest
 from django.core.cache import cache
+from django.utils import timezone
 from rest_framework import status
 
 from ads.models import Ad, Category, Product, ProductImage
@@ -45,9 +48,12 @@ class TestAdsCacheRedis:
     @pytest.fixture
     def redis_client(self):
         from django_redis import get_redis_connection
+
         return get_redis_connection("default")
 
-    def test_ad_list_cache_redis(self, api_client, ad, redis_client):
+    def test_ad_list_cache_redis(
+        self, api_client, ad, redis_client, django_capture_on_commit_callbacks
+    ):
         url = "/api/v1/ads/public/"
         cache.clear()
         redis_client.flushdb()
@@ -62,8 +68,9 @@ class TestAdsCacheRedis:
 
         assert first_results == second_results
 
-        ad.title = "Ad Atualizado"
-        ad.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            ad.title = "Ad Atualizado"
+            ad.save()
 
         response3 = api_client.get(url)
         updated_results = response3.json()["results"]
@@ -71,7 +78,19 @@ class TestAdsCacheRedis:
         assert updated_results[0]["title"] == "Ad Atualizado"
         assert updated_results != second_results
 
-    def test_ad_detail_cache_redis(self, api_client, ad, redis_client):
+    def test_blank_cursor_shares_the_page_number_entry(self, api_client, ad):
+        url = "/api/v1/ads/public/"
+
+        blank = api_client.get(url, {"cursor": ""})
+        plain = api_client.get(url)
+
+        assert blank.data["count"] == plain.data["count"] == 1
+        keys = cache.keys("tagged-response:AdPublicListView:*")
+        assert len([key for key in keys if not key.endswith(":lock")]) == 1
+
+    def test_ad_detail_cache_redis(
+        self, api_client, ad, redis_client, django_capture_on_commit_callbacks
+    ):
         url = f"/api/v1/ads/public/{ad.id}/"
         cache.clear()
         redis_client.flushdb()
@@ -86,10 +105,270 @@ class TestAdsCacheRedis:
 
         assert first_data == second_data
 
-        ad.description = "Descrição Atualizada"
-        ad.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            ad.description = "Descrição Atualizada"
+            ad.save()
 
         response3 = api_client.get(url)
         updated_data = response3.json()
         assert updated_data["description"] == "Descrição Atualizada"
         assert updated_data != second_data
+
+    def test_ad_detail_cache_survives_unrelated_write(
+        self, api_client, ad, product, redis_client
+    ):
+        url = f"/api/v1/ads/public/{ad.id}/"
+        cache.clear()
+
+        first_data = api_client.get(url).json()
+
+        Ad.objects.filter(id=ad.id).update(description="Alterado sem sinal")
+        Ad.objects.create(title="Outro Ad", product=product)
+
+        cached_data = api_client.get(url).json()
+        assert cached_data == first_data
+
+    def test_product_change_invalidates_ad_detail(
+        self, api_client, ad, product, django_capture_on_commit_callbacks
+    ):
+        url = f"/api/v1/ads/public/{ad.id}/"
+        cache.clear()
+
+        api_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.name = "Produto Renomeado"
+            product.save()
+
+        response = api_client.get(url)
+        assert response.json()["product"]["name"] == "Produto Renomeado"
+
+    def test_category_change_invalidates_ad_detail(
+        self, api_client, ad, category, django_capture_on_commit_callbacks
+    ):
+        url = f"/api/v1/ads/public/{ad.id}/"
+        cache.clear()
+
+        api_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            category.name = "Categoria Renomeada"
+            category.save()
+
+        response = api_client.get(url)
+        assert response.json()["product"]["category"]["name"] == "Categoria Renomeada"
+
+    def test_invalidation_waits_for_commit(
+        self, api_client, ad, django_capture_on_commit_callbacks
+    ):
+        url = f"/api/v1/ads/public/{ad.id}/"
+        api_client.get(url)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            ad.description = "Ainda não commitado"
+            ad.save()
+            assert api_client.get(url).json()["description"] == "Descrição do Ad"
+
+        for callback in callbacks:
+            callback()
+        assert api_client.get(url).json()["description"] == "Ainda não commitado"
+
+    def test_invalidation_does_not_scan_keys(
+        self, ad, mocker, django_capture_on_commit_callbacks
+    ):
+        delete_pattern = mocker.spy(cache, "delete_pattern")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ad.title = "Ad Atualizado"
+            ad.save()
+
+        delete_pattern.assert_not_called()
+
+
+def _expire_soft_ttl(pattern):
+    for key in cache.keys(pattern):
+        if key.endswith(":lock"):
+            continue
+        entry = cache.get(key)
+        entry["fresh_until"] = 0
+        cache.set(key, entry)
+        return key
+
+
+@pytest.mark.django_db
+class TestStaleWhileRevalidate:
+
+    @pytest.fixture
+    def ad(self, db):
+        category = Category.objects.create(name="Categoria Teste")
+        product = Product.objects.create(name="Produto Teste", category=category)
+        return Ad.objects.create(
+            title="Ad Teste", description="Original", product=product
+        )
+
+    def test_stale_response_served_while_locked(self, api_client, ad):
+        url = f"/api/v1/ads/public/{ad.id}/"
+        cache.clear()
+        api_client.get(url)
+
+        Ad.objects.filter(id=ad.id).update(description="Regenerado")
+        key = _expire_soft_ttl("tagged-response:AdPublicDetailView:*")
+
+        cache.add(f"{key}:lock", 1)
+        assert api_client.get(url).json()["description"] == "Original"
+
+        cache.delete(f"{key}:lock")
+        assert api_client.get(url).json()["description"] == "Regenerado"
+        assert api_client.get(url).json()["description"] == "Regenerado"
+
+    def test_invalidated_entry_is_never_served_stale(
+        self, api_client, ad, django_capture_on_commit_callbacks
+    ):
+        url = f"/api/v1/ads/public/{ad.id}/"
+        cache.clear()
+        api_client.get(url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ad.description = "Atualizado"
+            ad.save()
+
+        assert api_client.get(url).json()["description"] == "Atualizado"
+
+
+@pytest.mark.django_db
+class TestScheduledExpiry:
+
+    @pytest.fixture
+    def ad(self, db):
+        return Ad.objects.create(
+            title="Ad Teste", end_date=timezone.now() + timedelta(seconds=30)
+        )
+
+    def _ttl(self, pattern):
+        (key,) = [key for key in cache.keys(pattern) if not key.endswith(":lock")]
+        return cache.ttl(key)
+
+    def test_list_entry_expires_with_next_ad_boundary(self, api_client, ad):
+        cache.clear()
+        api_client.get("/api/v1/ads/public/")
+        assert 0 < self._ttl("tagged-response:AdPublicListView:*") <= 30
+
+    def test_list_entry_expires_when_scheduled_ad_starts(self, api_client, ad):
+        ad.end_date = None
+        ad.start_date = timezone.now() + timedelta(seconds=20)
+        ad.save()
+        cache.clear()
+
+        response = api_client.get("/api/v1/ads/public/")
+
+        assert response.json()["results"] == []
+        assert 0 < self._ttl("tagged-response:AdPublicListView:*") <= 20
+
+    def test_detail_entry_expires_with_ad(self, api_client, ad):
+        cache.clear()
+        api_client.get(f"/api/v1/ads/public/{ad.id}/")
+        assert 0 < self._ttl("tagged-response:AdPublicDetailView:*") <= 30
+
+    def test_sparse_detail_entry_still_expires_with_ad(self, api_client, ad):
+        cache.clear()
+        api_client.get(f"/api/v1/ads/public/{ad.id}/", {"fields": "title"})
+        assert 0 < self._ttl("tagged-response:AdPublicDetailView:*") <= 30
+
+    def test_unscheduled_ads_keep_full_timeout(self, api_client, ad):
+        ad.end_date = None
+        ad.save()
+        cache.clear()
+        api_client.get("/api/v1/ads/public/")
+        assert self._ttl("tagged-response:AdPublicListView:*") > 30
+
+
+def test_concurrent_misses_run_view_once():
+    import threading
+    import time
+
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.response import Response
+    from rest_framework.test import APIRequestFactory
+
+    from utils.cache_tags import tagged_cache_page
+
+    calls = []
+
+    class SlowView:
+        @tagged_cache_page(60, stale_timeout=60)
+        def get(self, request):
+            calls.append(1)
+            time.sleep(0.3)
+            return Response({"value": len(calls)})
+
+        def get_cache_tags(self, data):
+            return {"slow-view"}
+
+    def fetch(results):
+        request = APIRequestFactory().get("/slow/")
+        response = SlowView().get(request)
+        if not response.is_rendered:
+            response.accepted_renderer = JSONRenderer()
+            response.accepted_media_type = "application/json"
+            response.renderer_context = {}
+            response.render()
+        results.append(response.content)
+
+    cache.clear()
+    results = []
+    threads = [threading.Thread(target=fetch, args=(results,)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [b'{"value":1}'] * 5
+
+
+def test_response_racing_an_invalidation_is_not_stored():
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.response import Response
+    from rest_framework.test import APIRequestFactory
+
+    from utils.cache_tags import invalidate_tags, tagged_cache_page
+
+    calls = []
+
+    class RacingView:
+        @tagged_cache_page(60)
+        def get(self, request):
+            calls.append(1)
+            # A write commits after the query ran, before the render.
+            if len(calls) == 1:
+                invalidate_tags("racing-view")
+            return Response({"value": len(calls)})
+
+        def get_cache_tags(self, data):
+            return {"racing-view"}
+
+    def fetch():
+        response = RacingView().get(APIRequestFactory().get("/racing/"))
+        if not response.is_rendered:
+            response.accepted_renderer = JSONRenderer()
+            response.accepted_media_type = "application/json"
+            response.renderer_context = {}
+            response.render()
+        return response.content
+
+    cache.clear()
+
+    assert fetch() == b'{"value":1}'
+    assert fetch() == b'{"value":2}'
+    assert fetch() == b'{"value":2}'
+    assert len(calls) == 2
+
+
+def test_query_params_keep_value_order():
+    from rest_framework.test import APIRequestFactory
+
+    from utils.cache_tags import normalize_query_params
+
+    request = APIRequestFactory().get("/?tag=b&tag=a&tag=b&q=&page=1&active=true")
+
+    assert normalize_query_params(object(), request) == "active=true&tag=b&tag=a&tag=b"
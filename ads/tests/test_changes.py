@@ -0,0 +1,174 @@
+import datetime
+import io
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from ads.models import (
+    Ad,
+    Category,
+    Product,
+    ProductImage,
+    Store,
+    Tombstone,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_settle_delay(settings):
+    settings.CHANGE_FEED_SETTLE_SECONDS = 0
+
+
+@pytest.fixture
+def catalog(db):
+    category = Category.objects.create(name="Eletrônicos")
+    store = Store.objects.create(name="Loja Teste")
+    product = Product.objects.create(
+        name="Mouse", category=category, sale_price="99.90"
+    )
+    return [
+        Ad.objects.create(title=f"Ad {index}", store=store, product=product)
+        for index in range(3)
+    ]
+
+
+def _sync(client, name, watermark=None, **params):
+    if watermark:
+        params["updated_since"] = watermark
+    response = client.get(reverse(name), params)
+    assert response.status_code == 200
+    return response.data
+
+
+@pytest.mark.django_db
+class TestChangeFeed:
+    def test_full_sync_then_only_changes(self, user_client, catalog):
+        first = _sync(user_client, "ads_changes")
+
+        assert [ad["id"] for ad in first["results"]] == [ad.id for ad in catalog]
+        assert first["deleted"] == [] and first["has_more"] is False
+
+        catalog[0].title = "Editado"
+        catalog[0].save()
+        deleted_id = catalog[1].id
+        catalog[1].delete()
+        second = _sync(user_client, "ads_changes", first["watermark"])
+
+        assert [ad["title"] for ad in second["results"]] == ["Editado"]
+        assert second["deleted"] == [deleted_id]
+
+        third = _sync(user_client, "ads_changes", second["watermark"])
+        assert third["results"] == [] and third["deleted"] == []
+        assert third["watermark"] == second["watermark"]
+
+    def test_pages_through_same_timestamp(self, user_client, catalog):
+        now = timezone.now() - datetime.timedelta(minutes=1)
+        Ad.objects.update(updated_at=now)
+        Tombstone.objects.create(resource="ads.ad", object_id=999, deleted_at=now)
+
+        seen, deleted, watermark = [], [], None
+        while True:
+            page = _sync(user_client, "ads_changes", watermark, page_size=2)
+            seen += [ad["id"] for ad in page["results"]]
+            deleted += page["deleted"]
+            watermark = page["watermark"]
+            if not page["has_more"]:
+                break
+            assert page["next"]
+
+        assert seen == sorted(ad.id for ad in catalog)
+        assert deleted == [999]
+
+    def test_settle_delay_holds_back_recent_rows(self, user_client, catalog, settings):
+        settings.CHANGE_FEED_SETTLE_SECONDS = 60
+
+        assert _sync(user_client, "ads_changes")["results"] == []
+
+    def test_iso_datetime_watermark(self, user_client, catalog):
+        Ad.objects.filter(id=catalog[0].id).update(
+            updated_at=timezone.now() - datetime.timedelta(days=2)
+        )
+        since = (timezone.now() - datetime.timedelta(days=1)).isoformat()
+
+        page = _sync(user_client, "ads_changes", since)
+
+        assert {ad["id"] for ad in page["results"]} == {
+            catalog[1].id,
+            catalog[2].id,
+        }
+
+    def test_invalid_watermark(self, user_client, catalog):
+        response = user_client.get(reverse("ads_changes"), {"updated_since": "x!"})
+
+        assert response.status_code == 404
+
+    def test_deleting_product_resends_its_ads(self, user_client, catalog):
+        watermark = _sync(user_client, "ads_changes")["watermark"]
+        product_id = catalog[0].product_id
+
+        Product.objects.get(id=product_id).delete()
+
+        page = _sync(user_client, "ads_changes", watermark)
+        assert [ad["product"] for ad in page["results"]] == [None] * 3
+        products = _sync(user_client, "product_changes")
+        assert products["deleted"] == [product_id]
+
+    def test_product_changes_resend_its_ads(self, user_client, catalog):
+        watermark = _sync(user_client, "ads_changes")["watermark"]
+        product = Product.objects.get(id=catalog[0].product_id)
+
+        product.name = "Mouse sem fio"
+        product.save()
+
+        page = _sync(user_client, "ads_changes", watermark)
+        assert [ad["product"]["name"] for ad in page["results"]] == [
+            "Mouse sem fio"
+        ] * 3
+
+        ProductImage.objects.create(product=product, is_main=True)
+
+        assert len(_sync(user_client, "ads_changes", page["watermark"])["results"]) == 3
+
+    def test_category_rename_resends_its_products(self, user_client, catalog):
+        watermark = _sync(user_client, "product_changes")["watermark"]
+        category = Category.objects.get()
+
+        category.name = "Informática"
+        category.save()
+
+        page = _sync(user_client, "product_changes", watermark)
+        assert [product["category"]["name"] for product in page["results"]] == [
+            "Informática"
+        ]
+
+    def test_expired_watermark(self, user_client, catalog, settings):
+        settings.CHANGE_FEED_TOMBSTONE_DAYS = 1
+        since = (timezone.now() - datetime.timedelta(days=2)).isoformat()
+
+        response = user_client.get(reverse("ads_changes"), {"updated_since": since})
+
+        assert response.status_code == 410
+
+    def test_prune_tombstones(self, catalog, settings):
+        settings.CHANGE_FEED_TOMBSTONE_DAYS = 30
+        old = timezone.now() - datetime.timedelta(days=31)
+        Tombstone.objects.create(resource="ads.ad", object_id=1, deleted_at=old)
+        recent = Tombstone.objects.create(resource="ads.ad", object_id=2)
+
+        call_command("prune_tombstones", stdout=io.StringIO())
+
+        assert list(Tombstone.objects.all()) == [recent]
+
+    @pytest.mark.parametrize(
+        "name", ["product_changes", "ads_stores_changes", "ads_categories_changes"]
+    )
+    def test_other_resources(self, user_client, catalog, name):
+        page = _sync(user_client, name)
+
+        assert len(page["results"]) == 1
+        assert page["watermark"]
+
+    def test_requires_authentication(self, api_client, catalog):
+        assert api_client.get(reverse("ads_changes")).status_code in (401, 403)
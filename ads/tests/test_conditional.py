@@ -0,0 +1,118 @@
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from ads.models import Ad, Category, Product
+from utils.cache_tags import RESPONSE_KEY_PREFIX
+
+
+@pytest.fixture
+def product(db):
+    category = Category.objects.create(name="Eletrônicos")
+    return Product.objects.create(name="Mouse", category=category, sale_price="99.90")
+
+
+@pytest.fixture
+def ad(product):
+    return Ad.objects.create(title="Mouse barato", product=product)
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def test_public_list_not_modified_from_cache(
+        self, api_client, ad, django_assert_num_queries
+    ):
+        url = reverse("ad_public_list")
+        first = api_client.get(url)
+        assert first.status_code == 200
+        etag = first["ETag"]
+
+        with django_assert_num_queries(0):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+        assert response.content == b""
+
+    def test_public_list_cache_miss_not_modified_before_serializing(
+        self,
+        api_client,
+        ad,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            ad.save()
+        url = reverse("ad_public_list")
+        first = api_client.get(url)
+        cache.delete_pattern(f"{RESPONSE_KEY_PREFIX}:*")
+
+        with django_assert_num_queries(1):
+            response = api_client.get(
+                url,
+                HTTP_IF_NONE_MATCH=first["ETag"],
+                HTTP_IF_MODIFIED_SINCE=first["Last-Modified"],
+            )
+
+        assert response.status_code == 304
+        assert response["ETag"] == first["ETag"]
+
+    def test_public_list_if_modified_since(self, api_client, ad):
+        url = reverse("ad_public_list")
+        first = api_client.get(url)
+
+        response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+        assert response.status_code == 304
+
+    def test_public_list_changes_etag_after_update(
+        self, api_client, ad, django_capture_on_commit_callbacks
+    ):
+        url = reverse("ad_public_list")
+        etag = api_client.get(url)["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ad.title = "Mouse mais barato"
+            ad.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_etag_varies_with_query(self, api_client, ad):
+        url = reverse("ad_public_list")
+
+        assert (
+            api_client.get(url)["ETag"]
+            != api_client.get(url, {"fields": "title"})["ETag"]
+        )
+
+    def test_product_detail_validated_before_serializing(
+        self, admin_client, product, django_assert_num_queries
+    ):
+        url = reverse("product_detail", kwargs={"pk": product.id})
+        first = admin_client.get(url)
+        assert "Last-Modified" in first
+
+        with django_assert_num_queries(1):
+            response = admin_client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        assert response.status_code == 304
+
+    def test_product_detail_changes_after_category_update(self, admin_client, product):
+        url = reverse("product_detail", kwargs={"pk": product.id})
+        etag = admin_client.get(url)["ETag"]
+
+        product.category.name = "Informática"
+        product.category.save()
+        response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.data["category"]["name"] == "Informática"
+
+    def test_missing_product_is_still_404(self, admin_client, db):
+        response = admin_client.get(
+            reverse("product_detail", kwargs={"pk": 999}), HTTP_IF_NONE_MATCH="*"
+        )
+
+        assert response.status_code == 404
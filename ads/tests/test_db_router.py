@@ -0,0 +1,162 @@
+import time
+
+import pytest
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ads.models import Ad, Category, Product
+from core.db_router import PrimaryReplicaRouter, ReplicaRoutingMiddleware
+from utils.cache_tags import invalidate_tags
+
+router = PrimaryReplicaRouter()
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica_1"]
+    settings.DATABASE_REPLICA_PATHS = ["/api/v1/ads/public/"]
+    settings.DATABASE_PRIMARY_STICKY_SECONDS = 5
+
+
+def _route(request, write=False):
+    seen = {}
+
+    def get_response(request):
+        if write:
+            router.db_for_write(Ad)
+        seen["read"] = router.db_for_read(Ad)
+        return HttpResponse()
+
+    response = ReplicaRoutingMiddleware(get_response)(request)
+    return seen["read"], response
+
+
+class TestPrimaryReplicaRouter:
+    def test_public_reads_go_to_replica(self, replicas):
+        db, _ = _route(RequestFactory().get("/api/v1/ads/public/"))
+        assert db == "replica_1"
+
+    def test_other_paths_read_primary(self, replicas):
+        db, _ = _route(RequestFactory().get("/api/v1/ads/"))
+        assert db == "default"
+
+    def test_unsafe_methods_use_primary_and_pin(self, replicas):
+        db, response = _route(RequestFactory().post("/api/v1/ads/public/"), True)
+
+        assert db == "default"
+        assert float(response.cookies["db_primary_until"].value) > time.time()
+        assert response.cookies["db_primary_until"]["max-age"] == 5
+
+    def test_pinned_client_reads_primary(self, replicas):
+        request = RequestFactory().get("/api/v1/ads/public/")
+        request.COOKIES["db_primary_until"] = str(time.time() + 5)
+
+        db, _ = _route(request)
+        assert db == "default"
+
+    def test_expired_pin_reads_replica_again(self, replicas):
+        request = RequestFactory().get("/api/v1/ads/public/")
+        request.COOKIES["db_primary_until"] = str(time.time() - 1)
+
+        db, _ = _route(request)
+        assert db == "replica_1"
+
+    def test_reads_after_a_write_in_the_same_request_use_primary(self, replicas):
+        db, _ = _route(RequestFactory().get("/api/v1/ads/public/"), True)
+        assert db == "default"
+
+    def test_without_replicas_everything_uses_primary(self, settings):
+        settings.DATABASE_REPLICAS = []
+        db, response = _route(RequestFactory().get("/api/v1/ads/public/"), True)
+
+        assert db == "default"
+        assert "db_primary_until" not in response.cookies
+
+    def test_outside_requests_read_primary(self, replicas):
+        assert router.db_for_read(Ad) == "default"
+
+    def test_migrations_only_run_on_primary(self, replicas):
+        assert router.allow_migrate("default", "ads")
+        assert not router.allow_migrate("replica_1", "ads")
+
+
+@pytest.mark.django_db
+def test_favorite_write_pins_client_to_primary(user_client, replicas):
+    category = Category.objects.create(name="Eletrônicos")
+    product = Product.objects.create(name="Mouse", category=category)
+
+    response = user_client.post(
+        reverse("favorites_list_create"), {"product_id": product.id}
+    )
+
+    assert response.status_code == 201
+    assert "db_primary_until" in response.cookies
+
+
+@pytest.fixture
+def published_ad(transactional_db):
+    category = Category.objects.create(name="Eletrônicos")
+    product = Product.objects.create(name="Mouse", category=category)
+    yield Ad.objects.create(title="Mouse barato", product=product)
+    connections["replica_1"].close()
+    connections["replica_1"].close_pool()
+
+
+def _queries(client, method, url, **kwargs):
+    with (
+        CaptureQueriesContext(connections["default"]) as primary,
+        CaptureQueriesContext(connections["replica_1"]) as replica,
+    ):
+        response = getattr(client, method)(url, **kwargs)
+    return response, len(primary), len(replica)
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "replica_1"])
+class TestReplicaConnections:
+    def test_public_list_queries_run_on_replica(
+        self, api_client, replicas, published_ad, settings
+    ):
+        # Past the lag window of the invalidation made by saving the ad.
+        settings.DATABASE_PRIMARY_STICKY_SECONDS = 0
+        response, primary, replica = _queries(
+            api_client, "get", reverse("ad_public_list")
+        )
+
+        assert response.status_code == 200
+        assert response.data["results"][0]["id"] == published_ad.id
+        assert replica and not primary
+
+    def test_write_then_pinned_read_run_on_primary(
+        self, user_client, replicas, published_ad
+    ):
+        response, primary, replica = _queries(
+            user_client,
+            "post",
+            reverse("favorites_list_create"),
+            data={"product_id": published_ad.product_id},
+        )
+        assert response.status_code == 201
+        assert primary and not replica
+
+        response, primary, replica = _queries(
+            user_client, "get", reverse("ad_public_list")
+        )
+        assert response.status_code == 200
+        assert primary and not replica
+
+    def test_cache_miss_after_invalidation_renders_from_primary(
+        self, api_client, replicas, published_ad, settings
+    ):
+        invalidate_tags("ads:public-list")
+
+        _, primary, replica = _queries(api_client, "get", reverse("ad_public_list"))
+        assert primary and not replica
+
+        settings.DATABASE_PRIMARY_STICKY_SECONDS = 0
+        invalidate_tags("ads:public-list")
+
+        _, primary, replica = _queries(api_client, "get", reverse("ad_public_list"))
+        assert replica and not primary
@@ -0,0 +1,168 @@
+import asyncio
+import threading
+
+import pytest
+from django.test import AsyncRequestFactory, RequestFactory
+
+from ads.events import (
+    RESET,
+    EventFilter,
+    ad_event,
+    event_stream,
+    get_broker,
+)
+from ads.models import Ad, Category, Product, Store
+from ads.views import ad_event_stream
+
+
+@pytest.fixture
+def broker(settings):
+    settings.SSE_BROKER = "local"
+    settings.SSE_HEARTBEAT_SECONDS = 5
+    get_broker.cache_clear()
+    yield get_broker()
+    get_broker.cache_clear()
+
+
+def _stream(broker, filters, scenario):
+    async def run():
+        stream = event_stream(filters)
+        assert await anext(stream) == b"retry: 5000\n\n"
+        try:
+            return await scenario(stream)
+        finally:
+            await stream.aclose()
+
+    return asyncio.run(run())
+
+
+def test_filter():
+    filters = EventFilter.from_query({"types": "ad,price", "store": "1, 2"})
+
+    assert filters.matches(ad_event(1, 2, 9))
+    assert not filters.matches(ad_event(1, 3, 9))
+    assert not filters.matches({"type": "product", "id": 1, "category": 9})
+    assert filters.matches(RESET)
+    with pytest.raises(ValueError):
+        EventFilter.from_query({"category": "eletronicos"})
+
+
+def test_stream_delivers_events_published_from_other_threads(broker):
+    async def scenario(stream):
+        events = [ad_event(1, 1, 3), ad_event(2, 2, 3)]
+        threading.Thread(target=broker.publish, args=(events,)).start()
+        return await anext(stream)
+
+    chunk = _stream(broker, EventFilter(stores={2}), scenario)
+
+    assert chunk == (
+        b'event: ad\ndata: {"type":"ad","action":"saved","id":2,'
+        b'"store":2,"category":3}\n\n'
+    )
+    assert broker.listeners == {}
+
+
+def test_heartbeat(broker, settings):
+    settings.SSE_HEARTBEAT_SECONDS = 0.01
+
+    assert _stream(broker, EventFilter(), anext) == b": ping\n\n"
+
+
+def test_slow_listener_gets_reset(broker, settings):
+    settings.SSE_QUEUE_SIZE = 2
+
+    async def scenario(stream):
+        loop = asyncio.get_running_loop()
+        for pk in range(3):
+            broker.deliver(loop, ad_event(pk, 1, 1))
+        (subscription,) = broker.listeners[loop]
+        return await anext(stream), subscription.queue.qsize()
+
+    chunk, backlog = _stream(broker, EventFilter(), scenario)
+
+    assert chunk == b'event: reset\ndata: {"type":"reset"}\n\n'
+    assert backlog == 0
+
+
+@pytest.mark.django_db
+def test_signals_publish_after_commit(
+    broker, mocker, django_capture_on_commit_callbacks
+):
+    publish = mocker.patch.object(broker, "publish")
+    category = Category.objects.create(name="Eletrônicos")
+    store = Store.objects.create(name="Loja Teste")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        product = Product.objects.create(
+            name="Mouse", category=category, sale_price="99.90"
+        )
+        ad = Ad.objects.create(title="Mouse barato", store=store, product=product)
+    assert publish.call_count == 2
+    assert publish.call_args.args[0] == [ad_event(ad.id, store.id, category.id)]
+
+    publish.reset_mock()
+    product = Product.objects.get(id=product.id)
+    product.sale_price = "89.90"
+    with django_capture_on_commit_callbacks(execute=True):
+        product.save()
+
+    (events,) = publish.call_args.args
+    assert [event["type"] for event in events] == ["product", "price"]
+    assert events[1]["previous"] == "99.90"
+    assert events[1]["sale_price"] == "89.90"
+
+
+@pytest.mark.django_db
+def test_signals_only_publish_public_data(
+    broker, mocker, django_capture_on_commit_callbacks
+):
+    publish = mocker.patch.object(broker, "publish")
+    category = Category.objects.create(name="Eletrônicos")
+    product = Product.objects.create(
+        name="Mouse", category=category, sale_price="99.90"
+    )
+    ad = Ad.objects.create(title="Mouse barato", product=product)
+    ad = Ad.objects.get(id=ad.id)
+
+    ad.published = False
+    with django_capture_on_commit_callbacks(execute=True):
+        ad.save()
+        product.active = False
+        product.save()
+
+    ad_events, product_events = [call.args[0] for call in publish.call_args_list]
+    assert ad_events == [ad_event(ad.id, None, category.id, "deleted")]
+    assert product_events == [
+        {
+            "type": "product",
+            "action": "deleted",
+            "id": product.id,
+            "category": category.id,
+        }
+    ]
+
+
+def test_view_requires_asgi(broker):
+    request = RequestFactory().get("/api/v1/ads/stream/")
+
+    response = asyncio.run(ad_event_stream(request))
+
+    assert response.status_code == 501
+
+
+def test_view_rejects_invalid_filters(broker):
+    request = AsyncRequestFactory().get("/api/v1/ads/stream/", {"store": "x"})
+
+    response = asyncio.run(ad_event_stream(request))
+
+    assert response.status_code == 400
+
+
+def test_view_streams_events(broker):
+    request = AsyncRequestFactory().get("/api/v1/ads/stream/", {"category": "3"})
+
+    response = asyncio.run(ad_event_stream(request))
+
+    assert response["Content-Type"] == "text/event-stream"
+    assert response["Cache-Control"] == "no-cache"
+    assert response.streaming
@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db.models.query import QuerySet
+from django.test import AsyncRequestFactory
+from django.urls import reverse
+from rest_framework.test import force_authenticate
+
+from ads.models import Ad, Category, Favorite, Product, Store
+from ads.views import ProductExportView
+
+
+@pytest.fixture
+def catalog(db, user):
+    category = Category.objects.create(name="Eletrônicos")
+    store = Store.objects.create(name="Loja Teste")
+    mouse = Product.objects.create(
+        name="Mouse", category=category, cost_price="50.00", sale_price="99.90"
+    )
+    teclado = Product.objects.create(
+        name="Teclado, sem fio", category=category, sale_price="150.00"
+    )
+    Ad.objects.create(title="Mouse barato", store=store, product=mouse)
+    Ad.objects.create(title="Inativo", product=teclado, active=False)
+    Favorite.objects.create(user=user, product=mouse)
+
+
+def _content(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestExports:
+    def test_products_ndjson(self, admin_client, catalog):
+        response = admin_client.get(reverse("product_export"))
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert "attachment" in response["Content-Disposition"]
+        rows = [json.loads(line) for line in _content(response).splitlines()]
+        assert [row["name"] for row in rows] == ["Mouse", "Teclado, sem fio"]
+        assert rows[0]["cost_price"] == "50.00"
+        assert rows[0]["category"]["name"] == "Eletrônicos"
+
+    def test_products_csv(self, admin_client, catalog):
+        response = admin_client.get(reverse("product_export"), {"format": "csv"})
+
+        assert response["Content-Type"] == "text/csv; charset=utf-8"
+        assert response["Content-Disposition"].endswith('.csv"')
+        rows = list(csv.DictReader(io.StringIO(_content(response))))
+        assert [row["name"] for row in rows] == ["Mouse", "Teclado, sem fio"]
+        assert rows[0]["category.name"] == "Eletrônicos"
+        assert rows[0]["cost_price"] == "50.00"
+        assert rows[1]["main_image"] == ""
+
+    def test_csv_neutralizes_formulas(self, admin_client, catalog):
+        Product.objects.filter(name="Mouse").update(name='=HYPERLINK("x")')
+
+        response = admin_client.get(reverse("product_export"), {"format": "csv"})
+
+        rows = list(csv.DictReader(io.StringIO(_content(response))))
+        assert rows[0]["name"] == '\'=HYPERLINK("x")'
+
+    def test_ads_honor_filters_and_fields(self, admin_client, catalog):
+        response = admin_client.get(
+            reverse("ads_export"),
+            {"active": "true", "fields": "title,product.name", "format": "csv"},
+        )
+
+        assert _content(response).splitlines() == [
+            "id,title,product.id,product.name",
+            f"{Ad.objects.get(active=True).id},Mouse barato,"
+            f"{Product.objects.get(name='Mouse').id},Mouse",
+        ]
+
+    def test_favorites_of_every_user(self, admin_client, catalog):
+        response = admin_client.get(reverse("favorites_export"))
+
+        rows = [json.loads(line) for line in _content(response).splitlines()]
+        assert [row["product"]["name"] for row in rows] == ["Mouse"]
+
+    def test_reads_through_iterator(self, admin_client, catalog, mocker):
+        spy = mocker.spy(QuerySet, "iterator")
+
+        _content(admin_client.get(reverse("ads_export")))
+
+        assert spy.call_args.kwargs["chunk_size"] == 2000
+
+    def test_streams_chunk_by_chunk_under_asgi(self, admin_user, catalog):
+        request = AsyncRequestFactory().get("/api/v1/ads/products/export/")
+        force_authenticate(request, user=admin_user)
+        view = ProductExportView.as_view(export_chunk_size=1)
+
+        response = view(request)
+
+        async def collect():
+            return [chunk async for chunk in response.streaming_content]
+
+        assert response.is_async
+        chunks = async_to_sync(collect)()
+        assert len(chunks) == 2
+        assert b'"name":"Mouse"' in chunks[0]
+        assert b'"name":"Teclado, sem fio"' in chunks[1]
+
+    def test_staff_only(self, user_client, catalog):
+        response = user_client.get(reverse("product_export"))
+
+        assert response.status_code == 403
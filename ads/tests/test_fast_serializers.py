@@ -0,0 +1,88 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework import serializers
+
+from ads.models import Ad, Category, Favorite, Product, PublicAd, Store
+from ads.serializers import (
+    AdSerializer,
+    FavoriteSerializer,
+    ProductListSerializer,
+    PublicAdSerializer,
+)
+from utils.fast_serializers import FastListSerializer
+
+
+@pytest.fixture
+def catalog(db, user):
+    category = Category.objects.create(name="Eletrônicos")
+    store = Store.objects.create(name="Loja Teste")
+    product = Product.objects.create(
+        name="Mouse",
+        category=category,
+        cost_price="50.00",
+        sale_price="99.90",
+        main_image_url="https://res.cloudinary.com/demo/mouse.jpg",
+    )
+    Ad.objects.create(
+        title="Com produto",
+        store=store,
+        product=product,
+        end_date=timezone.now() + timezone.timedelta(days=1),
+    )
+    Ad.objects.create(title="Sem produto", description=None)
+    Favorite.objects.create(user=user, product=product)
+
+
+def _context(user):
+    request = RequestFactory().get("/")
+    request.user = user
+    return {"request": request}
+
+
+def _both(serializer_class, queryset, context):
+    drf = serializers.ListSerializer(
+        queryset, child=serializer_class(), context=context
+    ).data
+    fast = serializer_class(queryset, many=True, context=context).data
+    return drf, fast
+
+
+@pytest.mark.django_db
+class TestFastListSerializer:
+    @pytest.mark.parametrize(
+        "serializer_class, queryset",
+        [
+            (AdSerializer, lambda: Ad.objects.select_related("product")),
+            (PublicAdSerializer, lambda: PublicAd.objects.all()),
+            (ProductListSerializer, lambda: Product.objects.select_related("category")),
+            (FavoriteSerializer, lambda: Favorite.objects.select_related("product")),
+        ],
+    )
+    @pytest.mark.parametrize("staff", [True, False])
+    def test_output_matches_drf(
+        self, catalog, admin_user, serializer_class, queryset, staff
+    ):
+        context = _context(admin_user if staff else AnonymousUser())
+        drf, fast = _both(serializer_class, queryset(), context)
+
+        assert isinstance(serializer_class(many=True), FastListSerializer)
+        assert fast == drf
+        assert [list(item) for item in fast] == [list(item) for item in drf]
+
+    def test_cost_price_hidden_for_non_staff(self, catalog, user, admin_user):
+        products = Product.objects.select_related("category")
+
+        anonymous = ProductListSerializer(products, many=True, context=_context(user))
+        staff = ProductListSerializer(products, many=True, context=_context(admin_user))
+
+        assert "cost_price" not in anonymous.data[0]
+        assert staff.data[0]["cost_price"] == "50.00"
+
+    def test_public_ad_without_product_renders_null(self, catalog):
+        data = PublicAdSerializer(
+            PublicAd.objects.filter(product__isnull=True), many=True
+        ).data
+        assert data[0]["product"] is None
+        assert data[0]["active"] is True
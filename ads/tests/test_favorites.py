@@ -137,3 +137,107 @@ def test_order_favorites(user_client, favorites):
     data = response.json()
     names = [item["product"]["name"] for item in data["results"]]
     assert names == sorted(names)
+
+
+@pytest.fixture
+def other_user(db):
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.create_user(
+        email="other@test.com", password="123456"
+    )
+
+
+@pytest.mark.django_db
+def test_favorites_cache_is_per_user(api_client, user, other_user, favorites, products):
+    from django.core.cache import cache
+
+    cache.clear()
+    Favorite.objects.create(user=other_user, product=products[2])
+    url = reverse("favorites_list_create")
+
+    api_client.force_authenticate(user=user)
+    assert api_client.get(url).json()["count"] == 2
+
+    api_client.force_authenticate(user=other_user)
+    data = api_client.get(url).json()
+    assert data["count"] == 1
+    assert data["results"][0]["product"]["name"] == "Produto C"
+
+
+@pytest.mark.django_db
+def test_favorites_cache_not_invalidated_by_other_users(
+    api_client,
+    user,
+    other_user,
+    favorites,
+    products,
+    django_capture_on_commit_callbacks,
+):
+    from django.core.cache import cache
+
+    cache.clear()
+    url = reverse("favorites_list_create")
+    api_client.force_authenticate(user=user)
+    first = api_client.get(url).json()
+
+    # Changes without signals are only visible once the entry is dropped.
+    Product.objects.filter(id=products[0].id).update(name="Renomeado")
+    with django_capture_on_commit_callbacks(execute=True):
+        Favorite.objects.create(user=other_user, product=products[0])
+
+    assert api_client.get(url).json() == first
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Favorite.objects.create(user=user, product=products[2])
+    assert api_client.get(url).json() != first
+
+
+@pytest.mark.django_db
+def test_category_change_invalidates_favorites(
+    user_client, favorites, category, django_capture_on_commit_callbacks
+):
+    from django.core.cache import cache
+
+    cache.clear()
+    url = reverse("favorites_list_create")
+    user_client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        category.name = "Categoria Renomeada"
+        category.save()
+
+    results = user_client.get(url).json()["results"]
+    assert {fav["product"]["category"]["name"] for fav in results} == {
+        "Categoria Renomeada"
+    }
+
+
+@pytest.mark.django_db
+def test_favorites_cache_key_ignores_default_params(user_client, favorites):
+    from django.core.cache import cache
+
+    cache.clear()
+    url = reverse("favorites_list_create")
+    first = user_client.get(url).json()
+
+    Product.objects.filter(id=favorites[0].product_id).update(name="Renomeado")
+
+    for query in ["?page=1", "?page_size=10", "?search=", "?page=1&page_size=10"]:
+        assert user_client.get(url + query).json() == first
+
+
+@pytest.mark.django_db
+def test_list_favorites_renders_main_image(user_client, favorites, products):
+    from django.core.cache import cache
+
+    cache.clear()
+    products[0].images.create(image="main.jpg", is_main=True)
+
+    response = user_client.get(reverse("favorites_list_create"))
+    images = {
+        item["product"]["name"]: item["product"]["main_image"]
+        for item in response.json()["results"]
+    }
+    assert images["Produto A"].endswith("main.jpg")
+    assert images["Produto B"] is None
@@ -0,0 +1,90 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from ads.models import Category, Product
+from utils.parsers import ORJSONParser
+from utils.renderers import ORJSONRenderer
+
+PAYLOADS = [
+    {"price": Decimal("10.50"), "zero": Decimal("0.00")},
+    {"utc": datetime.datetime(2026, 1, 2, 3, 4, 5, 6, tzinfo=datetime.UTC)},
+    {
+        "sao_paulo": datetime.datetime(
+            2026, 1, 2, 3, 4, 5, tzinfo=ZoneInfo("America/Sao_Paulo")
+        ),
+        "london_winter": datetime.datetime(
+            2026, 1, 2, 3, 4, 5, tzinfo=ZoneInfo("Europe/London")
+        ),
+        "naive": datetime.datetime(2026, 1, 2, 3, 4, 5),
+        "date": datetime.date(2026, 1, 2),
+        "time": datetime.time(3, 4, 5, 123),
+        "duration": datetime.timedelta(hours=1, seconds=1.5),
+    },
+    {"text": "Promoção\u2028linha\u2029fim", "lazy": gettext_lazy("Promoção")},
+    {1: "chave int", "id": uuid.UUID(int=1), "tags": ("a", "b"), "none": None},
+    [{"nested": [1, 2.5, True, False, None, {"x": [Decimal("1.1")]}]}],
+    {"big": 2**70},
+]
+
+
+@pytest.mark.parametrize("data", PAYLOADS)
+def test_renderer_matches_drf_bytes(data):
+    assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_indented_output_falls_back_to_drf():
+    data = {"price": Decimal("1.00"), "items": [1, 2]}
+    media_type = "application/json; indent=4"
+
+    rendered = ORJSONRenderer().render(data, media_type, {})
+
+    assert rendered == JSONRenderer().render(data, media_type, {})
+    assert b"\n    " in rendered
+
+
+def test_none_renders_empty_body():
+    assert ORJSONRenderer().render(None) == b""
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"title": "An\\u00fancio", "price": 10.5, "ids": [1, 2], "ok": true}',
+        '{"title": "Anúncio", "nested": {"a": null}}'.encode(),
+        b'{"id": 123456789012345678901234567890, "min": -9999999999999999999}',
+    ],
+)
+def test_parser_matches_drf(body):
+    assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(
+        io.BytesIO(body)
+    )
+
+
+@pytest.mark.parametrize("body", [b"{invalid", b'{"value": NaN}'])
+def test_parser_rejects_what_drf_rejects(body):
+    with pytest.raises(ParseError):
+        JSONParser().parse(io.BytesIO(body))
+    with pytest.raises(ParseError):
+        ORJSONParser().parse(io.BytesIO(body))
+
+
+@pytest.mark.django_db
+def test_api_uses_orjson(admin_client):
+    category = Category.objects.create(name="Eletrônicos")
+    Product.objects.create(name="Mouse", category=category, sale_price="99.90")
+
+    response = admin_client.get(reverse("product_list"))
+
+    assert isinstance(response.accepted_renderer, ORJSONRenderer)
+    assert response.content == JSONRenderer().render(response.data)
+    assert '"sale_price":"99.90"' in response.content.decode()
@@ -0,0 +1,121 @@
+import runpy
+
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from ads.models import Ad, Category, Product
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.fixture
+def ad(db):
+    category = Category.objects.create(name="Eletrônicos")
+    product = Product.objects.create(name="Mouse", category=category)
+    return Ad.objects.create(title="Ad Teste", product=product)
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    def test_requests_are_recorded_by_view_class(self, api_client, ad):
+        labels = {"view": "AdPublicListView", "method": "GET"}
+        before = _sample("http_request_duration_seconds_count", **labels)
+        responses = _sample("http_requests_total", status="200", **labels)
+
+        api_client.get(reverse("ad_public_list"))
+
+        assert _sample("http_request_duration_seconds_count", **labels) == before + 1
+        assert _sample("http_requests_total", status="200", **labels) == responses + 1
+
+    def test_db_queries_are_recorded(self, api_client, ad):
+        cache.clear()
+        before = _sample("http_request_db_queries_sum", view="AdPublicListView")
+
+        api_client.get(reverse("ad_public_list"))
+
+        assert _sample("http_request_db_queries_sum", view="AdPublicListView") > before
+
+    def test_response_cache_hits_and_misses(self, api_client, ad):
+        cache.clear()
+        hits = _sample(
+            "response_cache_requests_total", view="AdPublicListView", result="hit"
+        )
+        misses = _sample(
+            "response_cache_requests_total", view="AdPublicListView", result="miss"
+        )
+
+        api_client.get(reverse("ad_public_list"))
+        api_client.get(reverse("ad_public_list"))
+
+        assert (
+            _sample(
+                "response_cache_requests_total", view="AdPublicListView", result="miss"
+            )
+            == misses + 1
+        )
+        assert (
+            _sample(
+                "response_cache_requests_total", view="AdPublicListView", result="hit"
+            )
+            == hits + 1
+        )
+
+    def test_signal_invalidations_are_counted_by_kind(
+        self, ad, django_capture_on_commit_callbacks
+    ):
+        before = _sample("cache_tag_invalidations_total", kind="ad")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ad.title = "Atualizado"
+            ad.save()
+
+        assert _sample("cache_tag_invalidations_total", kind="ad") == before + 1
+
+    def test_endpoint_serves_prometheus_text(self, api_client, ad, settings):
+        settings.METRICS_ALLOWED_IPS = ["127.0.0.1"]
+        api_client.get(reverse("ad_public_list"))
+
+        response = api_client.get("/api/v1/metrics")
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain")
+        body = response.content.decode()
+        assert (
+            'http_request_duration_seconds_bucket{le="0.005",method="GET",view="AdPublicListView"}'
+            in body
+        )
+        assert "cache_tag_invalidations_total" in body
+
+    def test_endpoint_rejects_other_addresses(self, api_client, settings):
+        settings.METRICS_ALLOWED_IPS = ["127.0.0.1"]
+
+        response = api_client.get("/api/v1/metrics", REMOTE_ADDR="203.0.113.7")
+
+        assert response.status_code == 403
+
+    def test_endpoint_is_staff_only_by_default(self, api_client):
+        response = api_client.get("/api/v1/metrics")
+
+        assert response.status_code == 403
+
+    def test_endpoint_allows_staff_from_anywhere(self, api_client, admin_user):
+        api_client.force_login(admin_user)
+
+        response = api_client.get("/api/v1/metrics", REMOTE_ADDR="203.0.113.7")
+
+        assert response.status_code == 200
+
+
+def test_gunicorn_marks_dead_workers(mocker, monkeypatch, tmp_path):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    mark = mocker.patch("prometheus_client.multiprocess.mark_process_dead")
+    config = runpy.run_path(str(settings.BASE_DIR / "gunicorn.conf.py"))
+
+    config["child_exit"](None, mocker.Mock(pid=1234))
+
+    mark.assert_called_once_with(1234)
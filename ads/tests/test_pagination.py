@@ -0,0 +1,172 @@
+import base64
+import json
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ads.models import Ad, Category, Product
+
+
+@pytest.fixture
+def category(db):
+    return Category.objects.create(name="Eletrônicos")
+
+
+@pytest.fixture
+def products(category):
+    return [
+        Product.objects.create(name=name, category=category)
+        for name in ["Mouse", "Teclado", "Monitor", "Mouse", "Cabo", "Webcam", "Hub"]
+    ]
+
+
+@pytest.fixture
+def ads(db):
+    return [Ad.objects.create(title=f"Ad {index}") for index in range(7)]
+
+
+def _cursor(position):
+    return base64.urlsafe_b64encode(json.dumps({"p": position}).encode()).decode()
+
+
+def _walk(client, url, params):
+    ids, pages = [], 0
+    response = client.get(url, params)
+    while True:
+        pages += 1
+        data = response.json()
+        ids.extend(item["id"] for item in data["results"])
+        if not data["next"]:
+            return ids, pages, data
+        response = client.get(data["next"])
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    def test_products_cursor_walks_every_row_once(self, api_client, products):
+        url = reverse("product_list")
+        ids, pages, last = _walk(
+            api_client, url, {"pagination": "cursor", "page_size": 2}
+        )
+
+        expected = list(
+            Product.objects.order_by("name", "id").values_list("id", flat=True)
+        )
+        assert ids == expected
+        assert pages == 4
+        assert "count" not in last
+
+    def test_ads_cursor_orders_by_newest_first(self, admin_client, ads):
+        ids, _, _ = _walk(
+            admin_client, reverse("ads_list"), {"pagination": "cursor", "page_size": 3}
+        )
+        expected = list(
+            Ad.objects.order_by("-created_at", "id").values_list("id", flat=True)
+        )
+        assert ids == expected
+
+    def test_previous_link_returns_previous_page(self, api_client, products):
+        url = reverse("product_list")
+        first = api_client.get(url, {"pagination": "cursor", "page_size": 3}).json()
+        assert first["previous"] is None
+
+        second = api_client.get(first["next"]).json()
+        back = api_client.get(second["previous"]).json()
+
+        assert back["results"] == first["results"]
+
+    def test_cursor_pages_do_not_count(self, api_client, products):
+        cache.clear()
+        url = reverse("product_list")
+        first = api_client.get(url, {"pagination": "cursor", "page_size": 2}).json()
+
+        with CaptureQueriesContext(connection) as context:
+            api_client.get(first["next"])
+
+        assert not any("COUNT(" in query["sql"] for query in context.captured_queries)
+
+    @pytest.mark.parametrize(
+        "cursor", ["invalido", _cursor(["Mouse", "x"]), _cursor(["Mouse"])]
+    )
+    def test_invalid_cursor_returns_404(self, api_client, products, cursor):
+        response = api_client.get(reverse("product_list"), {"cursor": cursor})
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize("param", ["ordering", "search"])
+    def test_cursor_rejects_other_orderings(self, api_client, products, param):
+        response = api_client.get(
+            reverse("product_list"), {"pagination": "cursor", param: "name"}
+        )
+
+        assert response.status_code == 400
+        assert param in response.json()
+
+    def test_page_number_envelope_is_default(self, api_client, products):
+        data = api_client.get(reverse("product_list")).json()
+        assert data["count"] == len(products)
+        assert data["current_page"] == 1
+
+
+@pytest.mark.django_db
+class TestPaginationCount:
+    def test_small_querysets_are_counted_exactly(self, api_client, products):
+        data = api_client.get(reverse("product_list")).json()
+        assert data["count"] == len(products)
+        assert data["count_exact"] is True
+
+    def test_unfiltered_large_queryset_uses_planner_estimate(
+        self, admin_client, ads, settings
+    ):
+        settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD = 0
+
+        with CaptureQueriesContext(connection) as context:
+            data = admin_client.get(reverse("ads_list")).json()
+
+        assert data["count_exact"] is False
+        assert data["count"] >= 0
+        assert not any("COUNT(" in query["sql"] for query in context.captured_queries)
+
+    def test_filtered_large_queryset_count_is_cached(
+        self, api_client, products, category, settings
+    ):
+        settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD = 0
+        cache.clear()
+        url = reverse("product_list")
+
+        first = api_client.get(url, {"search": "mo"}).json()
+        assert first["count_exact"] is True
+
+        Product.objects.create(name="Mouse sem fio", category=category)
+        second = api_client.get(url, {"search": "mo"}).json()
+
+        assert second["count"] == first["count"]
+        assert second["count_exact"] is False
+
+    def test_pages_past_an_underestimate_are_served(
+        self, admin_client, ads, settings, mocker
+    ):
+        settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD = 0
+        mocker.patch("utils.custom_pagination._planner_estimate", return_value=2)
+        url = reverse("ads_list")
+
+        second = admin_client.get(url, {"page": 2, "page_size": 2}).json()
+        last = admin_client.get(url, {"page": 4, "page_size": 2}).json()
+
+        assert second["count"] == 2 and second["count_exact"] is False
+        assert len(second["results"]) == 2 and second["next"]
+        assert len(last["results"]) == 1 and last["next"] is None
+        assert admin_client.get(url, {"page": 5, "page_size": 2}).status_code == 404
+
+    def test_planner_estimate_is_cached(self, admin_client, ads, settings):
+        settings.PAGINATION_COUNT_ESTIMATE_THRESHOLD = 0
+        cache.clear()
+        url = reverse("ads_list")
+        admin_client.get(url)
+
+        with CaptureQueriesContext(connection) as context:
+            admin_client.get(url, {"page": 2, "page_size": 2})
+
+        assert not any("EXPLAIN" in query["sql"] for query in context.captured_queries)
@@ -2,6 +2,7 @@ import io
 from decimal import Decimal
 
 import pytest
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 from PIL import Image
@@ -95,7 +96,6 @@ class TestProductImageModel:
             )
 
 
-
 @pytest.mark.django_db
 class TestProductListCreateAPI:
     def test_list_products_as_admin(self, admin_client, product):
@@ -121,7 +121,9 @@ class TestProductListCreateAPI:
         assert response.status_code == 201
         assert Product.objects.filter(name="Mouse").exists()
 
-    def test_create_product_as_non_admin_returns_403(self, user_client, product_payload):
+    def test_create_product_as_non_admin_returns_403(
+        self, user_client, product_payload
+    ):
         url = reverse("product_list_create")
         response = user_client.post(url, product_payload)
         assert response.status_code == 403
@@ -142,7 +144,10 @@ class TestProductListCreateAPI:
         url = reverse("product_list_create") + "?sale_price__lte=1000"
         response = admin_client.get(url)
         assert response.status_code == 200
-        assert any(Decimal(p["sale_price"]) <= Decimal("1000") for p in response.data["results"])
+        assert any(
+            Decimal(p["sale_price"]) <= Decimal("1000")
+            for p in response.data["results"]
+        )
 
     def test_search_product_by_name(self, admin_client, product):
         url = reverse("product_list_create") + "?search=Notebook"
@@ -150,6 +155,7 @@ class TestProductListCreateAPI:
         assert response.status_code == 200
         assert response.data["count"] == 1
 
+
 @pytest.mark.django_db
 class TestProductRetrieveUpdateDestroyAPI:
     def test_retrieve_product_as_admin(self, admin_client, product):
@@ -193,6 +199,7 @@ class TestProductRetrieveUpdateDestroyAPI:
         response = user_client.delete(url)
         assert response.status_code == 403
 
+
 @pytest.mark.django_db
 class TestProductImageAPI:
     def test_create_main_image_as_admin(self, admin_client, product, image_file):
@@ -205,7 +212,9 @@ class TestProductImageAPI:
         assert response.status_code == 201
         assert ProductImage.objects.count() == 1
 
-    def test_create_second_main_image_returns_400(self, admin_client, product, image_file):
+    def test_create_second_main_image_returns_400(
+        self, admin_client, product, image_file
+    ):
         ProductImage.objects.create(product=product, image=image_file, is_main=True)
         url = reverse("product_image_create", kwargs={"product_id": product.id})
         response = admin_client.post(
@@ -216,7 +225,9 @@ class TestProductImageAPI:
         assert response.status_code == 400
         assert "is_main" in response.data
 
-    def test_create_image_as_non_admin_returns_403(self, user_client, product, image_file):
+    def test_create_image_as_non_admin_returns_403(
+        self, user_client, product, image_file
+    ):
         url = reverse("product_image_create", kwargs={"product_id": product.id})
         response = user_client.post(url, {"image": image_file}, format="multipart")
         assert response.status_code == 403
@@ -227,3 +238,278 @@ class TestProductImageAPI:
         response = admin_client.delete(url)
         assert response.status_code == 204
         assert ProductImage.objects.count() == 0
+
+
+@pytest.mark.django_db
+class TestProductMainImage:
+    def test_public_list_renders_main_image(self, api_client, product):
+        ProductImage.objects.create(product=product, image="main.jpg", is_main=True)
+        ProductImage.objects.create(product=product, image="other.jpg")
+
+        response = api_client.get(reverse("product_list"))
+
+        assert response.status_code == 200
+        assert response.data["results"][0]["main_image"].endswith("main.jpg")
+
+    def test_public_list_without_main_image(self, api_client, product):
+        response = api_client.get(reverse("product_list"))
+        assert response.data["results"][0]["main_image"] is None
+
+    def test_main_image_url_follows_swap_and_delete(self, product):
+        first = ProductImage.objects.create(
+            product=product, image="first.jpg", is_main=True
+        )
+        second = ProductImage.objects.create(product=product, image="second.jpg")
+        product.refresh_from_db()
+        assert product.main_image_url.endswith("first.jpg")
+
+        first.is_main = False
+        first.save()
+        second.is_main = True
+        second.save()
+        product.refresh_from_db()
+        assert product.main_image_url.endswith("second.jpg")
+
+        second.delete()
+        product.refresh_from_db()
+        assert product.main_image_url is None
+
+    def test_moving_main_image_updates_both_products(self, product):
+        other = Product.objects.create(name="Teclado", category=product.category)
+        ProductImage.objects.create(product=product, image="main.jpg", is_main=True)
+
+        image = ProductImage.objects.get()
+        image.product = other
+        image.save()
+
+        product.refresh_from_db()
+        other.refresh_from_db()
+        assert product.main_image_url is None
+        assert other.main_image_url.endswith("main.jpg")
+
+    def test_stale_product_save_keeps_main_image_url(self, product):
+        stale = Product.objects.get(id=product.id)
+        ProductImage.objects.create(product=product, image="main.jpg", is_main=True)
+
+        stale.name = "Renomeado"
+        stale.save()
+
+        product.refresh_from_db()
+        assert product.name == "Renomeado"
+        assert product.main_image_url.endswith("main.jpg")
+
+    def test_public_list_does_not_query_images(self, api_client, product):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        ProductImage.objects.create(product=product, image="main.jpg", is_main=True)
+        with CaptureQueriesContext(connection) as context:
+            api_client.get(reverse("product_list"))
+
+        assert not any(
+            "ads_productimage" in query["sql"] for query in context.captured_queries
+        )
+
+
+@pytest.mark.django_db
+class TestProductPublicListQueries:
+    def test_public_list_does_not_load_deferred_fields(self, api_client, category):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        Product.objects.create(name="Produto 1", category=category)
+        with CaptureQueriesContext(connection) as small:
+            api_client.get(reverse("product_list"))
+
+        for index in range(2, 10):
+            Product.objects.create(name=f"Produto {index}", category=category)
+        cache.clear()  # The planner estimate is cached.
+        with CaptureQueriesContext(connection) as large:
+            response = api_client.get(reverse("product_list"))
+
+        assert response.data["count"] == 9
+        assert "description" in response.data["results"][0]
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    def test_deferred_field_guard_reports_lazy_loads(self, product):
+        from utils.deferred_guard import DeferredFieldAccess, deferred_field_guard
+
+        deferred = Product.objects.only("id").get(id=product.id)
+        with deferred_field_guard("raise"):
+            with pytest.raises(DeferredFieldAccess):
+                deferred.description
+
+    def test_deferred_field_guard_logs_in_log_mode(self, product, caplog):
+        from utils.deferred_guard import deferred_field_guard
+
+        deferred = Product.objects.only("id").get(id=product.id)
+        with deferred_field_guard("log"):
+            assert deferred.name == "Notebook"
+        assert "ads.Product.name" in caplog.text
+
+
+@pytest.mark.django_db
+class TestProductImport:
+    def _import(self, client, body, content_type="text/csv"):
+        return client.post(reverse("product_import"), body, content_type=content_type)
+
+    def test_csv_creates_and_updates_by_sku(self, admin_client, category, product):
+        product.sku = "NB-1"
+        product.save()
+        body = (
+            "sku,name,category,stock,sale_price\n"
+            f"NB-1,Notebook Pro,{category.id},3,\n"
+            f"MS-1,Mouse,{category.id},20,99.90\n"
+        )
+
+        response = self._import(admin_client, body)
+
+        assert response.status_code == 200
+        assert response.data["created"] == 1
+        assert response.data["updated"] == 1
+        product.refresh_from_db()
+        assert product.name == "Notebook Pro"
+        assert product.stock == 3
+        assert product.sale_price == Decimal("1000.00")
+        assert Product.objects.get(sku="MS-1").sale_price == Decimal("99.90")
+
+    def test_jsonl_reports_row_errors(self, admin_client, category):
+        body = "\n".join(
+            [
+                f'{{"sku": "MS-1", "name": "Mouse", "category": {category.id}}}',
+                "{não é json",
+                '{"sku": "MS-2", "name": "Teclado", "category": 999}',
+                f'{{"name": "Sem SKU", "category": {category.id}}}',
+            ]
+        )
+
+        response = self._import(admin_client, body, "application/jsonl")
+
+        assert response.data["created"] == 1
+        assert response.data["failed"] == 3
+        errors = {error["line"]: error["errors"] for error in response.data["errors"]}
+        assert set(errors) == {2, 3, 4}
+        assert "category" in errors[3]
+        assert "sku" in errors[4]
+        assert Product.objects.filter(sku="MS-1").exists()
+
+    def test_queries_do_not_grow_with_rows(self, admin_client, category):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def body(count, offset):
+            rows = [f"P-{offset + n},Produto,{category.id}" for n in range(count)]
+            return "sku,name,category\n" + "\n".join(rows)
+
+        with CaptureQueriesContext(connection) as small:
+            self._import(admin_client, body(2, 0))
+        with CaptureQueriesContext(connection) as large:
+            self._import(admin_client, body(50, 100))
+
+        assert Product.objects.count() == 52
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    def test_updates_refresh_public_ads(self, admin_client, category, product):
+        from ads.models import Ad, PublicAd
+
+        product.sku = "NB-1"
+        product.save()
+        ad = Ad.objects.create(title="Oferta", product=product)
+
+        self._import(
+            admin_client, f"sku,name,category\nNB-1,Notebook Pro,{category.id}\n"
+        )
+
+        assert PublicAd.objects.get(id=ad.id).product_name == "Notebook Pro"
+
+    def test_updates_touch_ads(self, admin_client, category, product):
+        from ads.models import Ad
+
+        product.sku = "NB-1"
+        product.save()
+        ad = Ad.objects.create(title="Oferta", product=product)
+        before = ad.updated_at
+
+        self._import(
+            admin_client, f"sku,name,category\nNB-1,Notebook Pro,{category.id}\n"
+        )
+
+        ad.refresh_from_db()
+        assert ad.updated_at > before
+
+    def test_invalid_utf8_stops_with_partial_report(self, admin_client, category):
+        body = (
+            f"sku,name,category\nMS-1,Mouse,{category.id}\n".encode()
+            + b"MS-2,Teclado \xff,1\n"
+        )
+
+        response = self._import(admin_client, body)
+
+        assert response.status_code == 200
+        assert response.data["created"] == 1
+        assert response.data["errors"][0]["line"] == 3
+        assert Product.objects.filter(sku="MS-1").exists()
+
+    def test_malformed_csv_stops_with_partial_report(self, admin_client, category):
+        body = (
+            f"sku,name,category\nMS-1,Mouse,{category.id}\n"
+            f"MS-2,{'x' * 200_000},{category.id}\n"
+        )
+
+        response = self._import(admin_client, body)
+
+        assert response.status_code == 200
+        assert response.data["created"] == 1
+        assert response.data["failed"] == 1
+        assert response.data["errors"][0]["line"] == 3
+
+    def test_jsonl_reports_invalid_utf8_lines(self, admin_client, category):
+        body = b'{"sku": "\xff"}\n' + (
+            f'{{"sku": "MS-1", "name": "Mouse", "category": {category.id}}}'.encode()
+        )
+
+        response = self._import(admin_client, body, "application/jsonl")
+
+        assert response.data["created"] == 1
+        assert response.data["errors"][0]["line"] == 1
+
+    def test_failed_chunk_still_invalidates(
+        self, admin_client, category, product, monkeypatch
+    ):
+        from ads import imports
+
+        product.sku = "NB-1"
+        product.save()
+        calls = []
+        original = imports.ProductImport.import_chunk
+
+        def import_chunk(self, chunk):
+            if self.updated:
+                raise RuntimeError
+            original(self, chunk)
+
+        monkeypatch.setattr(imports, "BATCH_SIZE", 1)
+        monkeypatch.setattr(imports.ProductImport, "import_chunk", import_chunk)
+        monkeypatch.setattr(
+            imports, "invalidate_tags", lambda *tags: calls.append(tags)
+        )
+        monkeypatch.setattr(
+            imports, "publish_events", lambda events: calls.append(events)
+        )
+        body = f"sku,name,category\nNB-1,Novo,{category.id}\nMS-1,Mouse,{category.id}\n"
+
+        with pytest.raises(RuntimeError):
+            imports.ProductImport().run(
+                imports.read_csv_rows(io.BytesIO(body.encode()))
+            )
+
+        assert calls == [("products", "ads:public-list"), [imports.RESET]]
+
+    def test_unsupported_content_type(self, admin_client):
+        response = self._import(admin_client, "{}", "application/json")
+        assert response.status_code == 415
+
+    def test_non_staff_cannot_import(self, user_client, category):
+        response = self._import(user_client, f"sku,name,category\nX,Y,{category.id}\n")
+        assert response.status_code == 403
+        assert not Product.objects.exists()
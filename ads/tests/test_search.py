@@ -0,0 +1,123 @@
+import pytest
+from django.urls import reverse
+
+from ads.models import Ad, Category, Product, Store
+
+
+@pytest.fixture
+def category(db):
+    return Category.objects.create(name="Informática")
+
+
+@pytest.fixture
+def products(category):
+    other = Category.objects.create(name="Videogames")
+    return [
+        Product.objects.create(
+            name="Notebook Gamer", description="Placa de vídeo", category=category
+        ),
+        Product.objects.create(
+            name="Mouse", description="Ideal para notebook", category=category
+        ),
+        Product.objects.create(name="Controle", category=other),
+    ]
+
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+    def test_products_search_ranks_name_matches_first(self, admin_client, products):
+        response = admin_client.get(
+            reverse("product_list_create"), {"search": "notebook"}
+        )
+        names = [item["name"] for item in response.data["results"]]
+        assert names == ["Notebook Gamer", "Mouse"]
+
+    def test_products_search_matches_word_prefixes(self, admin_client, products):
+        response = admin_client.get(
+            reverse("product_list_create"), {"search": "note gam"}
+        )
+        names = [item["name"] for item in response.data["results"]]
+        assert names == ["Notebook Gamer"]
+
+    def test_products_search_matches_category_name(self, api_client, products):
+        response = api_client.get(reverse("product_list"), {"search": "videogames"})
+        names = [item["name"] for item in response.data["results"]]
+        assert names == ["Controle"]
+
+    def test_numeric_search_looks_up_id(self, admin_client, products):
+        target = products[2]
+        response = admin_client.get(
+            reverse("product_list_create"), {"search": str(target.id)}
+        )
+        assert [item["id"] for item in response.data["results"]] == [target.id]
+
+    @pytest.mark.parametrize("term", ["²", "99999999999999999999999"])
+    def test_numeric_search_outside_ids(self, api_client, products, term):
+        response = api_client.get(reverse("product_list"), {"search": term})
+        assert response.status_code == 200
+        assert response.data["results"] == []
+
+    def test_explicit_ordering_overrides_rank(self, admin_client, products):
+        response = admin_client.get(
+            reverse("product_list_create"), {"search": "notebook", "ordering": "name"}
+        )
+        names = [item["name"] for item in response.data["results"]]
+        assert names == ["Mouse", "Notebook Gamer"]
+
+    def test_ads_search_uses_title_and_description(self, admin_client, products):
+        Ad.objects.create(title="Promoção de notebooks", product=products[0])
+        Ad.objects.create(title="Oferta", description="Notebook barato")
+        Ad.objects.create(title="Outro anúncio")
+
+        response = admin_client.get(reverse("ads_list"), {"search": "notebook"})
+        titles = [item["title"] for item in response.data["results"]]
+        assert titles == ["Promoção de notebooks", "Oferta"]
+
+    def test_search_terms_are_not_parsed_as_tsquery(self, api_client, products):
+        response = api_client.get(reverse("product_list"), {"search": "mouse & | !"})
+        assert response.status_code == 200
+        assert [item["name"] for item in response.data["results"]] == ["Mouse"]
+
+
+@pytest.mark.django_db
+class TestTrigramSearch:
+    def test_products_search_tolerates_typos(self, api_client, products):
+        response = api_client.get(reverse("product_list"), {"search": "notebok"})
+        names = [item["name"] for item in response.data["results"]]
+        assert names == ["Notebook Gamer"]
+
+    def test_products_search_matches_inside_words(self, api_client, products):
+        response = api_client.get(reverse("product_list"), {"search": "ontrol"})
+        names = [item["name"] for item in response.data["results"]]
+        assert names == ["Controle"]
+
+    def test_stores_are_ordered_by_similarity(self, admin_client):
+        Store.objects.create(name="Loja Central", city="Fortaleza", state="CE")
+        Store.objects.create(name="Centralizar Móveis", city="Recife", state="PE")
+        Store.objects.create(name="Outra Loja", city="Natal", state="RN")
+
+        response = admin_client.get(reverse("ads_stores_list"), {"search": "central"})
+        names = [item["name"] for item in response.data["results"]]
+        assert names == ["Loja Central", "Centralizar Móveis"]
+
+    def test_stores_search_covers_city(self, admin_client):
+        Store.objects.create(name="Loja A", city="Fortaleza", state="CE")
+        Store.objects.create(name="Loja B", city="Recife", state="PE")
+
+        response = admin_client.get(reverse("ads_stores_list"), {"search": "fortalesa"})
+        names = [item["name"] for item in response.data["results"]]
+        assert names == ["Loja A"]
+
+    def test_explicit_ordering_overrides_similarity(self, admin_client):
+        Store.objects.create(name="Loja Central", city="Fortaleza", state="CE")
+        Store.objects.create(name="Centralizar Móveis", city="Recife", state="PE")
+
+        response = admin_client.get(
+            reverse("ads_stores_list"), {"search": "central", "ordering": "name"}
+        )
+        names = [item["name"] for item in response.data["results"]]
+        assert names == ["Centralizar Móveis", "Loja Central"]
+
+    def test_like_wildcards_are_escaped(self, api_client, products):
+        response = api_client.get(reverse("product_list"), {"search": "%"})
+        assert response.data["results"] == []
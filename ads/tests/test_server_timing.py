@@ -0,0 +1,73 @@
+import logging
+import re
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ads.models import Ad, Category, Product
+
+
+@pytest.fixture
+def ads(db):
+    category = Category.objects.create(name="Eletrônicos")
+    product = Product.objects.create(name="Mouse", category=category)
+    return [
+        Ad.objects.create(title=f"Ad {index}", product=product) for index in range(3)
+    ]
+
+
+def _metrics(header):
+    return {
+        match["name"]: match
+        for match in re.finditer(
+            r'(?P<name>[\w-]+);dur=(?P<dur>[\d.]+)(?:;desc="(?P<desc>[^"]*)")?',
+            header,
+        )
+    }
+
+
+@pytest.mark.django_db
+class TestServerTiming:
+    def test_sampled_request_reports_timings(self, api_client, ads, settings):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(reverse("ad_public_list"))
+
+        metrics = _metrics(response["Server-Timing"])
+        assert set(metrics) == {"db", "cache", "storage", "render", "total"}
+        assert metrics["db"]["desc"] == f"{len(context.captured_queries)} queries"
+        assert float(metrics["cache"]["dur"]) > 0
+        assert float(metrics["render"]["dur"]) > 0
+        assert float(metrics["total"]["dur"]) >= float(metrics["db"]["dur"])
+
+    def test_cached_response_makes_no_queries(self, api_client, ads, settings):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+        cache.clear()
+        api_client.get(reverse("ad_public_list"))
+
+        response = api_client.get(reverse("ad_public_list"))
+
+        metrics = _metrics(response["Server-Timing"])
+        assert metrics["db"]["desc"] == "0 queries"
+        assert float(metrics["cache"]["dur"]) > 0
+
+    def test_unsampled_request_has_no_header(self, api_client, ads, settings):
+        settings.SERVER_TIMING_SAMPLE_RATE = 0
+        response = api_client.get(reverse("ad_public_list"))
+        assert "Server-Timing" not in response
+
+    def test_timings_are_logged_as_fields(self, api_client, ads, settings, caplog):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+        with caplog.at_level(logging.INFO, logger="utils.server_timing"):
+            api_client.get(reverse("ad_public_list"))
+
+        (record,) = caplog.records
+        assert record.view == "ad_public_list"
+        assert record.status == 200
+        assert record.db_queries >= 1
+        assert record.total_ms >= record.db_ms
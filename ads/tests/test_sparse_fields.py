@@ -0,0 +1,141 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ads.models import Ad, Category, Favorite, Product, Store
+from utils.sparse_fields import parse_fieldset
+
+
+@pytest.fixture
+def ads(db):
+    category = Category.objects.create(name="Eletrônicos")
+    store = Store.objects.create(name="Loja Teste")
+    product = Product.objects.create(
+        name="Mouse",
+        category=category,
+        cost_price="50.00",
+        sale_price="99.90",
+        main_image_url="https://res.cloudinary.com/demo/mouse.jpg",
+    )
+    return [
+        Ad.objects.create(
+            title=f"Ad {index}", description="Texto", store=store, product=product
+        )
+        for index in range(3)
+    ]
+
+
+def _get(client, name, params, **kwargs):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(reverse(name, kwargs=kwargs), params)
+    sql = " ".join(query["sql"] for query in context.captured_queries)
+    return response, sql
+
+
+def test_parse_fieldset():
+    assert parse_fieldset("id, title,product.main_image,product.id,,x.") == {
+        "id": None,
+        "title": None,
+        "product": {"main_image": None, "id": None},
+    }
+    assert parse_fieldset("product.name,product") == {"product": None}
+    assert parse_fieldset("product,product.name") == {"product": None}
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    def test_fields_trim_output_and_columns(self, admin_client, ads):
+        response, sql = _get(
+            admin_client, "ads_list", {"fields": "id,title,product.main_image"}
+        )
+
+        assert response.status_code == 200
+        item = response.data["results"][0]
+        assert set(item) == {"id", "title", "product"}
+        assert set(item["product"]) == {"id", "main_image"}
+        assert '"ads_ad"."description"' not in sql
+        assert '"ads_product"."sale_price"' not in sql
+        assert '"ads_store"' not in sql
+
+    def test_omit_drops_fields_and_joins(self, admin_client, ads):
+        response, sql = _get(admin_client, "ads_list", {"omit": "product,description"})
+
+        item = response.data["results"][0]
+        assert "product" not in item and "description" not in item
+        assert {"title", "store", "created_at"} <= set(item)
+        assert '"ads_product"' not in sql
+
+    def test_public_list(self, api_client, ads):
+        response, sql = _get(api_client, "ad_public_list", {"fields": "title"})
+
+        assert [set(item) for item in response.data["results"]] == [{"id", "title"}] * 3
+        assert "product_name" not in sql
+
+    def test_public_detail(self, api_client, ads):
+        response, _ = _get(
+            api_client, "ad_public_detail", {"fields": "title"}, id=ads[0].id
+        )
+
+        assert response.status_code == 200
+        assert set(response.data) == {"id", "title"}
+
+    def test_products_keep_hiding_cost_price(self, api_client, ads):
+        response, sql = _get(
+            api_client, "product_list", {"fields": "name,category.name,cost_price"}
+        )
+
+        item = response.data["results"][0]
+        assert set(item) == {"id", "name", "category"}
+        assert set(item["category"]) == {"id", "name"}
+        assert '"ads_product"."description"' not in sql
+
+    def test_favorites(self, user_client, user, ads):
+        favorite = Favorite.objects.create(user=user, product=ads[0].product)
+
+        response, sql = _get(
+            user_client, "favorites_list_create", {"fields": "product.name"}
+        )
+
+        assert response.data["results"] == [
+            {"id": favorite.id, "product": {"id": ads[0].product_id, "name": "Mouse"}}
+        ]
+        assert '"ads_category"' not in sql
+
+    def test_store_detail(self, admin_client, ads):
+        response, sql = _get(
+            admin_client,
+            "ads_stores_retrieve_update_destroy",
+            {"fields": "name"},
+            id=ads[0].store_id,
+        )
+
+        assert set(response.data) == {"id", "name"}
+        assert '"ads_store"."city"' not in sql
+
+    def test_cursor_pagination_with_sparse_fields(self, admin_client, ads):
+        response, _ = _get(
+            admin_client,
+            "ads_list",
+            {"fields": "title", "pagination": "cursor", "page_size": 2},
+        )
+
+        assert response.status_code == 200
+        assert response.data["next"]
+
+    def test_unknown_field_is_rejected(self, admin_client, ads):
+        response, _ = _get(admin_client, "ads_list", {"fields": "title,preco"})
+
+        assert response.status_code == 400
+        assert "preco" in str(response.data)
+
+    def test_writes_ignore_fieldsets(self, admin_client, ads):
+        response = admin_client.patch(
+            reverse("ads_retrieve_update_destroy", kwargs={"id": ads[0].id})
+            + "?fields=title",
+            {"title": "Novo"},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        assert "description" in response.data
@@ -1,27 +1,42 @@
 from django.urls import path
 
 from .views import (
+    AdBulkUpdateView,
+    AdChangesView,
     AdCreateAndListView,
+    AdExportView,
     AdPublicDetailView,
     AdPublicListView,
     AdRetrieveUpdateDestroyView,
+    CategoryChangesView,
     CategoryListAndCreateView,
     CategoryRetrieveUpdateDestroyView,
     FavoriteDeleteView,
+    FavoriteExportView,
     FavoriteListCreateView,
+    ProductChangesView,
+    ProductExportView,
     ProductImageCreateView,
     ProductImageRetrieveUpdateDestroyView,
+    ProductImportView,
     ProductListCreateView,
     ProductListView,
     ProductRetrieveUpdateDestroyView,
+    StoreChangesView,
     StoreCreateAndListView,
     StoreRetrieveUpdateDestroyView,
+    ad_event_stream,
 )
 
 urlpatterns = [
     path(
         "categories/", CategoryListAndCreateView.as_view(), name="ads_categories_list"
     ),
+    path(
+        "categories/changes/",
+        CategoryChangesView.as_view(),
+        name="ads_categories_changes",
+    ),
     path(
         "categories/<int:id>",
         CategoryRetrieveUpdateDestroyView.as_view(),
@@ -33,6 +48,21 @@ urlpatterns = [
         ProductListCreateView.as_view(),
         name="product_list_create",
     ),
+    path(
+        "products/import/",
+        ProductImportView.as_view(),
+        name="product_import",
+    ),
+    path(
+        "products/changes/",
+        ProductChangesView.as_view(),
+        name="product_changes",
+    ),
+    path(
+        "products/export/",
+        ProductExportView.as_view(),
+        name="product_export",
+    ),
     path(
         "products/<int:pk>/",
         ProductRetrieveUpdateDestroyView.as_view(),
@@ -49,6 +79,7 @@ urlpatterns = [
         name="product_image_update-delete",
     ),
     path("stores/", StoreCreateAndListView.as_view(), name="ads_stores_list"),
+    path("stores/changes/", StoreChangesView.as_view(), name="ads_stores_changes"),
     path(
         "stores/<int:id>/",
         StoreRetrieveUpdateDestroyView.as_view(),
@@ -60,6 +91,10 @@ urlpatterns = [
         AdRetrieveUpdateDestroyView.as_view(),
         name="ads_retrieve_update_destroy",
     ),
+    path("bulk/", AdBulkUpdateView.as_view(), name="ads_bulk_update"),
+    path("changes/", AdChangesView.as_view(), name="ads_changes"),
+    path("export/", AdExportView.as_view(), name="ads_export"),
+    path("stream/", ad_event_stream, name="ads_stream"),
     path("public/", AdPublicListView.as_view(), name="ad_public_list"),
     path("public/<int:id>/", AdPublicDetailView.as_view(), name="ad_public_detail"),
     path("", AdCreateAndListView.as_view(), name="ads_list"),
@@ -69,6 +104,11 @@ urlpatterns = [
         name="ads_retrieve_update_destroy",
     ),
     path("favorites/", FavoriteListCreateView.as_view(), name="favorites_list_create"),
+    path(
+        "favorites/export/",
+        FavoriteExportView.as_view(),
+        name="favorites_export",
+    ),
     path(
         "favorites/<int:favorite_id>/",
         FavoriteDeleteView.as_view(),
@@ -1,18 +1,45 @@
-from django.db.models import Prefetch
+import datetime
+
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics
 from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import UnsupportedMediaType, ValidationError
 from rest_framework.parsers import FormParser, MultiPartParser
-from rest_framework.permissions import AllowAny, IsAuthenticated
-
-from ads.filters import AdFilter
-
-from .models import Ad, Category, Favorite, Product, ProductImage, Store
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+
+from ads.filters import AdFilter, PublicAdFilter
+from utils.cache_tags import invalidate_tags, peek_tag_version, tagged_cache_page
+from utils.conditional import conditional_get
+from utils.exports import StreamingExportMixin
+from utils.search_filters import FullTextSearchFilter, TrigramSearchFilter
+from utils.sparse_fields import SparseFieldsFilter
+
+from .changes import ChangeFeedMixin
+from .events import EventFilter, event_stream, public_ad_events, publish_events
+from .imports import ProductImport, read_csv_rows, read_jsonl_rows
+from .models import (
+    Ad,
+    Category,
+    Favorite,
+    Product,
+    ProductImage,
+    PublicAd,
+    Store,
+    refresh_public_ads,
+    scheduled_window,
+)
 from .permissions import IsAdminOrReadOnly
 from .serializers import (
+    AdBulkUpdateSerializer,
     AdDetailSerializer,
     AdSerializer,
     CategorySerializer,
@@ -21,6 +48,7 @@ from .serializers import (
     ProductDetailSerializer,
     ProductImageCreateSerializer,
     ProductListSerializer,
+    PublicAdSerializer,
     StoreSerializer,
 )
 from .swagger_schemas import (
@@ -29,6 +57,23 @@ from .swagger_schemas import (
 )
 
 CACHE_TIMEOUT = 60
+PUBLIC_CACHE_STALE_TIMEOUT = 240
+
+
+def product_cache_tags(product):
+    tags = {"products", f"product:{product['id']}"}
+    if product.get("category"):
+        tags.add(f"category:{product['category']['id']}")
+    return tags
+
+
+def ad_cache_tags(ad):
+    tags = {f"ad:{ad['id']}"}
+    if ad.get("product"):
+        tags.update(product_cache_tags(ad["product"]))
+    if ad.get("store"):
+        tags.add(f"store:{ad['store']}")
+    return tags
 
 
 # CATEGORIES
@@ -51,6 +96,10 @@ class CategoryListAndCreateView(generics.ListCreateAPIView):
     orderning = ["name"]
 
 
+class CategoryChangesView(ChangeFeedMixin, CategoryListAndCreateView):
+    pass
+
+
 class CategoryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -67,11 +116,12 @@ class ProductListCreateView(generics.ListCreateAPIView):
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
+        SparseFieldsFilter,
     ]
     filterset_fields = ["active", "category", "stock", "cost_price", "sale_price"]
-    search_fields = ["id", "name", "active", "category__name"]
+    search_related_fields = {"category": "name"}
     ordering_fields = [
         "id",
         "name",
@@ -82,6 +132,7 @@ class ProductListCreateView(generics.ListCreateAPIView):
         "sale_price",
     ]
     ordering = ["name"]
+    cursor_ordering = ("name", "id")
 
     def get_queryset(self):
         return Product.objects.select_related("category")
@@ -92,6 +143,37 @@ class ProductListCreateView(generics.ListCreateAPIView):
         return ProductListSerializer
 
 
+class ProductChangesView(ChangeFeedMixin, ProductListCreateView):
+    pass
+
+
+class ProductExportView(StreamingExportMixin, ProductListCreateView):
+    export_name = "produtos"
+
+
+class ProductImportView(generics.GenericAPIView):
+    """
+    Creates or updates products by SKU from a CSV or JSON Lines body, read as
+    a stream. Answers with the counts and the errors of the rejected rows.
+    """
+
+    authentication_classes = [SessionAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    row_readers = {
+        "text/csv": read_csv_rows,
+        "application/jsonl": read_jsonl_rows,
+        "application/x-ndjson": read_jsonl_rows,
+    }
+
+    def post(self, request, *args, **kwargs):
+        content_type = request.content_type.split(";")[0].strip().lower()
+        read_rows = self.row_readers.get(content_type)
+        if read_rows is None:
+            raise UnsupportedMediaType(content_type)
+        report = ProductImport().run(read_rows(request.stream or []))
+        return Response(report)
+
+
 class ProductListView(generics.ListAPIView):
 
     permission_classes = [AllowAny]
@@ -101,11 +183,13 @@ class ProductListView(generics.ListAPIView):
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        TrigramSearchFilter,
+        SparseFieldsFilter,
     ]
     filterset_fields = ["category", "stock", "cost_price", "sale_price"]
-    search_fields = ["id", "name", "category__name"]
+    search_fields = ["name"]
+    search_related_fields = {"category": "name"}
     ordering_fields = [
         "id",
         "name",
@@ -116,6 +200,7 @@ class ProductListView(generics.ListAPIView):
         "sale_price",
     ]
     ordering = ["name"]
+    cursor_ordering = ("name", "id")
 
     def get_queryset(self):
         return (
@@ -125,13 +210,16 @@ class ProductListView(generics.ListAPIView):
                 "id",
                 "name",
                 "active",
+                "description",
+                "image",
+                "main_image_url",
                 "stock",
                 "cost_price",
                 "sale_price",
                 "created_at",
                 "category__id",
                 "category__name",
-                "category__active",
+                "category__image",
             )
         )
 
@@ -145,8 +233,24 @@ class ProductRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         DjangoFilterBackend,
         filters.SearchFilter,
         filters.OrderingFilter,
+        SparseFieldsFilter,
     ]
 
+    @conditional_get
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_conditional_validators(self):
+        state = (
+            self.get_queryset()
+            .filter(pk=self.kwargs["pk"])
+            .values_list("updated_at", "category__updated_at")
+            .first()
+        )
+        if state is None:
+            return None
+        return state, max(state)
+
     def get_queryset(self):
         return Product.objects.select_related("category")
 
@@ -198,8 +302,9 @@ class StoreCreateAndListView(generics.ListCreateAPIView):
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        TrigramSearchFilter,
+        SparseFieldsFilter,
     ]
     filterset_fields = ["active"]
     search_fields = ["name", "city", "state"]
@@ -207,6 +312,10 @@ class StoreCreateAndListView(generics.ListCreateAPIView):
     ordering = ["name"]
 
 
+class StoreChangesView(ChangeFeedMixin, StoreCreateAndListView):
+    pass
+
+
 class StoreRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Store.objects.all()
     serializer_class = StoreSerializer
@@ -223,11 +332,11 @@ class AdCreateAndListView(generics.ListCreateAPIView):
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
+        SparseFieldsFilter,
     ]
     filterset_class = AdFilter
-    search_fields = ["title", "description"]
     ordering_fields = [
         "id",
         "title",
@@ -238,6 +347,7 @@ class AdCreateAndListView(generics.ListCreateAPIView):
         "created_at",
     ]
     ordering = ["-created_at"]
+    cursor_ordering = ("-created_at", "id")
 
     def get_queryset(self):
         return Ad.objects.select_related("store", "product")
@@ -249,6 +359,14 @@ class AdCreateAndListView(generics.ListCreateAPIView):
         return AdSerializer
 
 
+class AdChangesView(ChangeFeedMixin, AdCreateAndListView):
+    pass
+
+
+class AdExportView(StreamingExportMixin, AdCreateAndListView):
+    export_name = "anuncios"
+
+
 class AdRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = AdDetailSerializer
     authentication_classes = [SessionAuthentication]
@@ -259,38 +377,117 @@ class AdRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
         return Ad.objects.select_related("store", "product")
 
 
+class AdBulkUpdateView(generics.GenericAPIView):
+    """
+    Applies active/published/start_date/end_date changes to many ads with a
+    single UPDATE and answers with the number of ads changed.
+    """
+
+    serializer_class = AdBulkUpdateSerializer
+    authentication_classes = [SessionAuthentication]
+    permission_classes = [IsAuthenticated, IsAdminOrReadOnly]
+
+    def patch(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queryset = self.filter_ads(serializer.validated_data)
+
+        with transaction.atomic():
+            ids = list(
+                queryset.select_for_update(of=("self",)).values_list("id", flat=True)
+            )
+            updated = Ad.objects.filter(id__in=ids).update(
+                updated_at=timezone.now(), **serializer.changes
+            )
+            # update() skips the post_save signals that keep these in sync.
+            refresh_public_ads(ids)
+            publish_events(public_ad_events(ids))
+        if ids:
+            invalidate_tags("ads:public-list", *(f"ad:{pk}" for pk in ids))
+        return Response({"updated": updated})
+
+    def filter_ads(self, data):
+        if "ids" in data:
+            return Ad.objects.filter(id__in=data["ids"])
+        filterset = AdFilter(data["filter"], queryset=Ad.objects.all())
+        unknown = set(data["filter"]) - set(filterset.filters)
+        if unknown:
+            raise ValidationError(
+                {
+                    "filter": [
+                        f"Filtro desconhecido: {name}." for name in sorted(unknown)
+                    ]
+                }
+            )
+        if not filterset.is_valid():
+            raise ValidationError({"filter": filterset.errors})
+        # Blank values filter nothing: {"store": ""} would select every ad.
+        cleaned = filterset.form.cleaned_data
+        for name, value in list(cleaned.items()):
+            if value is None or value == "":
+                del cleaned[name]
+        if not cleaned:
+            raise ValidationError({"filter": ["Nenhum filtro informado."]})
+        return filterset.qs
+
+
 class AdPublicListView(generics.ListAPIView):
     permission_classes = [AllowAny]
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
+        SparseFieldsFilter,
     ]
-    filterset_class = None
-    search_fields = ["title", "description"]
+    filterset_class = PublicAdFilter
     ordering_fields = [
         "id",
         "title",
-        "active",
-        "published",
         "store",
         "product",
         "created_at",
     ]
     ordering = ["-created_at"]
+    cursor_ordering = ("-created_at", "id")
 
-    serializer_class = AdSerializer
+    serializer_class = PublicAdSerializer
 
-    @method_decorator(cache_page(CACHE_TIMEOUT))
+    @tagged_cache_page(CACHE_TIMEOUT, stale_timeout=PUBLIC_CACHE_STALE_TIMEOUT)
+    @conditional_get
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
-    def get_queryset(self):
-
-        return Ad.objects.filter(active=True, published=True).select_related(
-            "product", "store"
+    def get_conditional_validators(self):
+        # Visible rows, schedule windows that opened or closed, and the list
+        # generation (bumped by deletes and unpublishing), in one aggregate.
+        now = timezone.now()
+        visible = scheduled_window(now)
+        state = self.filter_queryset(PublicAd.objects.all()).aggregate(
+            updated=Max("updated_at", filter=visible),
+            count=Count("id", filter=visible),
+            started=Max("start_date", filter=Q(start_date__lte=now)),
+            ended=Max("end_date", filter=Q(end_date__lte=now)),
         )
+        generation = peek_tag_version("ads:public-list")
+        modified = [state["updated"], state["started"], state["ended"]]
+        if generation:
+            modified.append(
+                datetime.datetime.fromtimestamp(generation / 10**9, datetime.UTC)
+            )
+        return (*state.values(), generation), max(filter(None, modified), default=None)
+
+    def get_cache_tags(self, data):
+        tags = {"ads:public-list"}
+        for ad in data["results"]:
+            tags.update(ad_cache_tags(ad))
+        return tags
+
+    def get_cache_expiry(self, data):
+        return PublicAd.objects.next_boundary()
+
+    def get_queryset(self):
+        return PublicAd.objects.scheduled()
 
 
 class AdPublicDetailView(generics.RetrieveAPIView):
@@ -298,14 +495,29 @@ class AdPublicDetailView(generics.RetrieveAPIView):
     lookup_field = "id"
     serializer_class = AdDetailSerializer
 
-    @method_decorator(cache_page(CACHE_TIMEOUT))
+    @tagged_cache_page(CACHE_TIMEOUT, stale_timeout=PUBLIC_CACHE_STALE_TIMEOUT)
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
+    def get_cache_tags(self, data):
+        return ad_cache_tags(data)
+
+    def get_cache_expiry(self, data):
+        if "end_date" in data:
+            end_date = data["end_date"]
+        else:
+            # Left out by ?fields=/?omit=, but the ad still leaves the feed then.
+            end_date = (
+                Ad.objects.filter(id=data["id"])
+                .values_list("end_date", flat=True)
+                .first()
+            )
+        if isinstance(end_date, str):
+            return parse_datetime(end_date)
+        return end_date
+
     def get_queryset(self):
-        return Ad.objects.filter(active=True, published=True).select_related(
-            "product", "store"
-        )
+        return Ad.objects.public().select_related("product", "store")
 
 
 # Favorites
@@ -318,22 +530,42 @@ class FavoriteListCreateView(generics.ListCreateAPIView):
         DjangoFilterBackend,
         filters.SearchFilter,
         filters.OrderingFilter,
+        SparseFieldsFilter,
     ]
     filterset_fields = ["product", "created_at"]
     search_fields = ["product__name", "product__category__name"]
     ordering_fields = ["created_at", "product__name"]
     ordering = ["-created_at"]
+    cursor_ordering = ("-created_at", "id")
 
-    @method_decorator(cache_page(CACHE_TIMEOUT))
+    @tagged_cache_page(CACHE_TIMEOUT, vary_on_user=True)
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
+    def get_cache_tags(self, data):
+        tags = {f"favorites:user:{self.request.user.pk}"}
+        for favorite in data["results"]:
+            if favorite.get("product"):
+                tags.update(product_cache_tags(favorite["product"]))
+        return tags
+
     def get_queryset(self):
         return Favorite.objects.filter(user=self.request.user).select_related(
             "product", "product__category"
         )
 
 
+class FavoriteExportView(StreamingExportMixin, FavoriteListCreateView):
+    """
+    Favoritos de todos os usuários.
+    """
+
+    export_name = "favoritos"
+
+    def get_queryset(self):
+        return Favorite.objects.select_related("product", "product__category")
+
+
 class FavoriteDeleteView(generics.DestroyAPIView):
     serializer_class = FavoriteSerializer
     permission_classes = [IsAuthenticated]
@@ -342,3 +574,31 @@ class FavoriteDeleteView(generics.DestroyAPIView):
 
     def get_queryset(self):
         return Favorite.objects.filter(user=self.request.user)
+
+
+# Events
+@require_GET
+async def ad_event_stream(request):
+    """
+    Server-sent events of ad, product and price changes. Only served through
+    the ASGI app: idle connections then cost a queue each, where under WSGI
+    each would hold a worker forever.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "Eventos ao vivo exigem um servidor ASGI (uvicorn)."},
+            status=501,
+        )
+    try:
+        filters = EventFilter.from_query(request.GET)
+    except ValueError:
+        return JsonResponse(
+            {"detail": "Filtros store e category devem ser ids."}, status=400
+        )
+    response = StreamingHttpResponse(
+        event_stream(filters), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,25 @@
+import copy
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """
+    Adiciona uma réplica espelhando o banco de teste, para que os testes de
+    roteamento vejam em qual conexão as consultas rodam.
+    """
+    from django.conf import settings
+
+    settings.DATABASES.setdefault(
+        "replica_1",
+        {**copy.deepcopy(settings.DATABASES["default"]), "TEST": {"MIRROR": "default"}},
+    )
+
+
+@pytest.fixture(autouse=True)
+def deferred_field_guard(settings):
+    """
+    Falha o teste se algum serializer carregar um campo adiado pelo .only()
+    """
+    settings.DEFERRED_FIELD_GUARD = "raise"
@@ -0,0 +1,105 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY = "default"
+
+_read_from_replica = ContextVar("read_from_replica", default=False)
+_wrote = ContextVar("wrote_to_primary", default=False)
+
+
+def replica_aliases():
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+@contextmanager
+def primary_reads():
+    """
+    Sends the reads inside the block to the primary, even in a replica-read
+    request.
+    """
+    token = _read_from_replica.set(False)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes always go to the primary. Reads go to a random replica only while
+    ReplicaRoutingMiddleware has marked the current request as a replica
+    read; everything else (admin, authenticated writes, shell, migrations)
+    keeps reading the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if replicas and _read_from_replica.get() and not _wrote.get():
+            return random.choice(replicas)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sends safe-method requests under DATABASE_REPLICA_PATHS to the replicas.
+    A request that writes sets a cookie pinning that client to the primary
+    for DATABASE_PRIMARY_STICKY_SECONDS, so it reads its own writes even
+    when the replicas lag behind.
+    """
+
+    cookie_name = "db_primary_until"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        read_token = _read_from_replica.set(self.use_replica(request))
+        wrote_token = _wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if _wrote.get() and replica_aliases():
+                self.pin_to_primary(response)
+            return response
+        finally:
+            _read_from_replica.reset(read_token)
+            _wrote.reset(wrote_token)
+
+    def use_replica(self, request):
+        if request.method not in ("GET", "HEAD", "OPTIONS") or not replica_aliases():
+            return False
+        if not request.path.startswith(
+            tuple(getattr(settings, "DATABASE_REPLICA_PATHS", ()))
+        ):
+            return False
+        try:
+            pinned_until = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            pinned_until = 0
+        return pinned_until < time.time()
+
+    def pin_to_primary(self, response):
+        seconds = getattr(settings, "DATABASE_PRIMARY_STICKY_SECONDS", 5)
+        response.set_cookie(
+            self.cookie_name,
+            str(time.time() + seconds),
+            max_age=seconds,
+            httponly=True,
+            samesite="Lax",
+        )
@@ -0,0 +1,107 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+
+SCENARIOS = [
+    ("sem reuso", {"DB_POOL": "false", "DB_CONN_MAX_AGE": "0"}),
+    ("conexões persistentes", {"DB_POOL": "false", "DB_CONN_MAX_AGE": "60"}),
+    ("pool psycopg", {"DB_POOL": "true"}),
+]
+
+NO_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara requisições/s da lista pública de anúncios sem reuso de "
+        "conexões, com conexões persistentes e com o pool do psycopg"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--url", default="/api/v1/ads/public/")
+        parser.add_argument(
+            "--single",
+            action="store_true",
+            help="Mede apenas a configuração atual e imprime as requisições/s",
+        )
+
+    def handle(self, *args, **options):
+        if options["single"]:
+            self.stdout.write(f"{self.measure(options):.1f}")
+            return
+
+        self.stdout.write(
+            f"{options['requests']} requisições, {options['concurrency']} threads, "
+            f"GET {options['url']} (cache desligado)\n"
+        )
+        for label, env in SCENARIOS:
+            # Each scenario needs its own process: DATABASES is read at startup.
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "django",
+                    "bench_db_pool",
+                    "--single",
+                    f"--requests={options['requests']}",
+                    f"--concurrency={options['concurrency']}",
+                    f"--url={options['url']}",
+                ],
+                env={**os.environ, **env},
+                capture_output=True,
+                text=True,
+            )
+            if result.returncode != 0:
+                raise CommandError(result.stderr.strip().splitlines()[-1])
+            rps = float(result.stdout.split()[-1])
+            self.stdout.write(f"{label:<24}{rps:>10.1f} req/s")
+
+    def measure(self, options):
+        total, concurrency, url = (
+            options["requests"],
+            options["concurrency"],
+            options["url"],
+        )
+        errors = []
+        # A real WSGI handler, unlike django.test.Client, keeps the
+        # request_started/request_finished hooks that close or return each
+        # request's connection, which is what the scenarios compare.
+        handler = WSGIHandler()
+
+        def start_response(status, headers):
+            if not status.startswith("200"):
+                errors.append(status)
+
+        def worker(count):
+            for _ in range(count):
+                environ = RequestFactory().get(url).environ
+                response = handler(environ, start_response)
+                try:
+                    b"".join(response)
+                finally:
+                    response.close()
+
+        with override_settings(CACHES=NO_CACHE):
+            worker(10)
+            threads = [
+                threading.Thread(target=worker, args=(total // concurrency,))
+                for _ in range(concurrency)
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+        if errors:
+            raise CommandError(f"{len(errors)} respostas com erro: {set(errors)}")
+        return (total // concurrency) * concurrency / elapsed
@@ -0,0 +1,74 @@
+import io
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core.management.commands.bench_serializers import build_page
+from utils.parsers import ORJSONParser
+from utils.renderers import ORJSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara renderização e parse JSON das páginas de anúncios, produtos "
+        "e favoritos entre o JSONRenderer/JSONParser do DRF e os de orjson"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=500)
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/")
+        request.user = get_user_model()(is_staff=True)
+        context = {"request": request}
+
+        self.stdout.write(
+            f"{options['page_size']} itens por página, {options['repeat']} vezes\n"
+        )
+        self.stdout.write(
+            f"{'payload':<24}{'':<8}{'DRF':>10}{'orjson':>10}{'ganho':>8}"
+        )
+        for serializer_class, page in build_page(options["page_size"]):
+            data = {
+                "count": len(page),
+                "next": None,
+                "previous": None,
+                "results": serializer_class(page, many=True, context=context).data,
+            }
+            body = JSONRenderer().render(data)
+            if ORJSONRenderer().render(data) != body:
+                raise CommandError(f"{serializer_class.__name__}: bytes diferentes")
+            if ORJSONParser().parse(io.BytesIO(body)) != JSONParser().parse(
+                io.BytesIO(body)
+            ):
+                raise CommandError(f"{serializer_class.__name__}: parse diferente")
+
+            label = serializer_class.__name__
+            for action, drf, fast in (
+                ("render", JSONRenderer().render, ORJSONRenderer().render),
+                (
+                    "parse",
+                    lambda body: JSONParser().parse(io.BytesIO(body)),
+                    lambda body: ORJSONParser().parse(io.BytesIO(body)),
+                ),
+            ):
+                value = data if action == "render" else body
+                drf_ms = self.measure(drf, value, options["repeat"])
+                fast_ms = self.measure(fast, value, options["repeat"])
+                self.stdout.write(
+                    f"{label:<24}{action:<8}{drf_ms:>8.3f}ms{fast_ms:>8.3f}ms"
+                    f"{drf_ms / fast_ms:>7.1f}x"
+                )
+                label = ""
+
+    def measure(self, function, value, repeat):
+        function(value)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            function(value)
+        return (time.perf_counter() - started) / repeat * 1000
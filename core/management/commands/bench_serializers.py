@@ -0,0 +1,116 @@
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework import serializers
+
+from ads.models import Ad, Category, Favorite, Product, PublicAd
+from ads.serializers import (
+    AdSerializer,
+    FavoriteSerializer,
+    ProductListSerializer,
+    PublicAdSerializer,
+)
+
+
+def build_page(size):
+    now = timezone.now()
+    category = Category(id=1, name="Eletrônicos")
+    products = [
+        Product(
+            id=index,
+            name=f"Produto {index}",
+            description="Descrição do produto",
+            category=category,
+            stock=index,
+            cost_price=Decimal("50.00"),
+            sale_price=Decimal(f"{index}.90"),
+            main_image_url=f"https://res.cloudinary.com/demo/{index}.jpg",
+        )
+        for index in range(1, size + 1)
+    ]
+    ads = [
+        Ad(
+            id=product.id,
+            title=f"Anúncio {product.id}",
+            description="Descrição do anúncio",
+            store_id=1,
+            product=product,
+            created_at=now,
+            updated_at=now,
+        )
+        for product in products
+    ]
+    public_ads = [
+        PublicAd(
+            id=product.id,
+            title=f"Anúncio {product.id}",
+            store_id=1,
+            product_id=product.id,
+            product_name=product.name,
+            product_sale_price=product.sale_price,
+            product_main_image_url=product.main_image_url,
+            created_at=now,
+            updated_at=now,
+        )
+        for product in products
+    ]
+    favorites = [
+        Favorite(id=product.id, user_id=1, product=product, created_at=now)
+        for product in products
+    ]
+    return [
+        (AdSerializer, ads),
+        (PublicAdSerializer, public_ads),
+        (ProductListSerializer, products),
+        (FavoriteSerializer, favorites),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o tempo de serialização de uma página das listas com o "
+        "ListSerializer do DRF e com o FastListSerializer"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page-size", type=int, default=100)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        context = {"request": request}
+
+        self.stdout.write(
+            f"{options['page_size']} itens por página, {options['repeat']} páginas\n"
+        )
+        self.stdout.write(f"{'serializer':<24}{'DRF':>10}{'rápido':>10}{'ganho':>8}")
+        for serializer_class, page in build_page(options["page_size"]):
+
+            def drf():
+                return serializers.ListSerializer(
+                    page, child=serializer_class(), context=context
+                ).data
+
+            def fast():
+                return serializer_class(page, many=True, context=context).data
+
+            if drf() != fast():
+                raise CommandError(f"{serializer_class.__name__}: saídas diferentes")
+            drf_ms = self.measure(drf, options["repeat"])
+            fast_ms = self.measure(fast, options["repeat"])
+            self.stdout.write(
+                f"{serializer_class.__name__:<24}{drf_ms:>8.2f}ms{fast_ms:>8.2f}ms"
+                f"{drf_ms / fast_ms:>7.1f}x"
+            )
+
+    def measure(self, render, repeat):
+        render()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            render()
+        return (time.perf_counter() - started) / repeat * 1000
@@ -0,0 +1,24 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ads.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove as marcações de exclusão dos feeds de alterações mais antigas "
+        "que CHANGE_FEED_TOMBSTONE_DAYS"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.CHANGE_FEED_TOMBSTONE_DAYS
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options["days"])
+        deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(f"{deleted} marcações removidas")
@@ -1,3 +1,4 @@
+import copy
 import os
 from pathlib import Path
 
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
     "cloudinary_storage",
     "cloudinary",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "corsheaders",
     "drf_yasg",
@@ -36,8 +38,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "utils.metrics.MetricsMiddleware",
+    "utils.server_timing.ServerTimingMiddleware",
     # "django.middleware.cache.UpdateCacheMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "django.middleware.http.ConditionalGetMiddleware",
+    "core.db_router.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -46,6 +52,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "utils.deferred_guard.DeferredFieldGuardMiddleware",
 ]
 
 
@@ -80,6 +87,46 @@ DATABASES = {
     }
 }
 
+# Connection reuse: a psycopg 3 pool by default (DB_POOL), otherwise persistent
+# connections kept for DB_CONN_MAX_AGE seconds. Health checks apply to both.
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = os.getenv(
+    "DB_HEALTH_CHECKS", "true"
+).lower() in ("1", "true")
+
+if os.getenv("DB_POOL", "true").lower() in ("1", "true"):
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "600")),
+            "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+        }
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+
+# Read replicas (comma separated hosts in DB_REPLICA_HOSTS) serve safe-method
+# requests under DATABASE_REPLICA_PATHS. A client that writes reads from the
+# primary for DATABASE_PRIMARY_STICKY_SECONDS, which should cover the replica
+# lag; cache misses right after an invalidation are rendered from the primary
+# for as long.
+DATABASE_REPLICAS = []
+for index, host in enumerate(
+    filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(","))
+):
+    alias = f"replica_{index + 1}"
+    DATABASES[alias] = {
+        **copy.deepcopy(DATABASES["default"]),
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["core.db_router.PrimaryReplicaRouter"]
+DATABASE_REPLICA_PATHS = ["/api/v1/ads/public/", "/api/v1/ads/products/public/"]
+DATABASE_PRIMARY_STICKY_SECONDS = int(os.getenv("DB_PRIMARY_STICKY_SECONDS", "5"))
+
 
 # Password validation
 
@@ -119,6 +166,12 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
+# Report lazy loads of fields left out of .only(): "log", "raise" or None
+DEFERRED_FIELD_GUARD = "log"
+
+# Share of requests timed and reported in the Server-Timing header (0 to 1)
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv("SERVER_TIMING_SAMPLE_RATE", "0.1"))
+
 # Custom user model
 AUTH_USER_MODEL = "users.User"
 
@@ -130,12 +183,35 @@ REST_FRAMEWORK = {
         "django_filters.rest_framework.DjangoFilterBackend",
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
+        "utils.sparse_fields.SparseFieldsFilter",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework.authentication.SessionAuthentication",
     ),
+    "DEFAULT_RENDERER_CLASSES": [
+        "utils.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "utils.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
+# Text search configuration used by the ads/products tsvector columns
+FULL_TEXT_SEARCH_CONFIG = "portuguese"
+
+# Pagination counts: above this planner estimate COUNT(*) is estimated or cached
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = 10000
+PAGINATION_COUNT_CACHE_TIMEOUT = 30
+
+# Change feeds hold back rows this recent, so slow transactions commit first
+CHANGE_FEED_SETTLE_SECONDS = 5
+# Tombstones older than this are pruned (manage.py prune_tombstones), so
+# older watermarks must resync from scratch
+CHANGE_FEED_TOMBSTONE_DAYS = int(os.getenv("CHANGE_FEED_TOMBSTONE_DAYS", "30"))
+
 # Storage
 
 MEDIA_URL = "/media/"
@@ -187,6 +263,20 @@ CACHES = {
 }
 
 
+# Server-sent events: "redis" pub/sub reaches the listeners of every worker,
+# "local" only those of the publishing process (single worker, tests)
+SSE_BROKER = os.getenv("SSE_BROKER", "redis")
+SSE_REDIS_URL = os.getenv("SSE_REDIS_URL", "redis://127.0.0.1:6379/2")
+# Events a listener may fall behind before it is told to resync
+SSE_QUEUE_SIZE = 100
+SSE_HEARTBEAT_SECONDS = 15
+
+# /api/v1/metrics answers staff sessions and these client addresses (the
+# Prometheus scraper), none by default; REMOTE_ADDR is the proxy when behind one
+METRICS_ALLOWED_IPS = list(
+    filter(None, os.getenv("METRICS_ALLOWED_IPS", "").split(","))
+)
+
 CACHE_MIDDLEWARE_SECONDS = 60
 CACHE_MIDDLEWARE_KEY_PREFIX = "admaker"
 
@@ -10,6 +10,7 @@ from rest_framework.reverse import reverse
 from rest_framework.views import APIView
 
 from utils.custom_schema_generator import CustomSchemaGenerator
+from utils.metrics import metrics_view
 
 schema_view = get_yasg_schema_view(
     openapi.Info(
@@ -63,6 +64,8 @@ urlpatterns = [
         name="schema-redoc",
     ),
     path("api/v1/", RootView.as_view(), name="root"),
+    # Metrics
+    path("api/v1/metrics", metrics_view, name="metrics"),
     # Users
     path("api/v1/users/", include("users.urls")),
     # Auth
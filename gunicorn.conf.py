@@ -0,0 +1,13 @@
+# gunicorn core.asgi:application -c gunicorn.conf.py
+import os
+
+from prometheus_client import multiprocess
+
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+
+
+def child_exit(server, worker):
+    # Drops the live gauges (open event streams) of the worker that exited.
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
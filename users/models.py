@@ -1,6 +1,7 @@
 from cloudinary_storage.storage import MediaCloudinaryStorage
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
 
@@ -43,6 +44,16 @@ class User(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            GinIndex(
+                fields=["name"], opclasses=["gin_trgm_ops"], name="users_name_trgm"
+            ),
+            GinIndex(
+                fields=["email"], opclasses=["gin_trgm_ops"], name="users_email_trgm"
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         self.username = self.email
         super().save(*args, **kwargs)
@@ -4,6 +4,8 @@ from rest_framework.authentication import SessionAuthentication
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 
+from utils.search_filters import TrigramSearchFilter
+
 from .models import User
 from .permissions import IsAdminOrSelf
 from .serializers import UserSerializer
@@ -18,8 +20,8 @@ class UserListAndCreateView(generics.ListCreateAPIView):
 
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        TrigramSearchFilter,
     ]
 
     search_fields = ["name", "email"]
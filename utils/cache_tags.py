@@ -0,0 +1,293 @@
+import hashlib
+import time
+from contextlib import nullcontext
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, set_response_etag
+from django.utils.http import http_date, parse_http_date
+
+from core.db_router import primary_reads, replica_aliases
+from utils.metrics import CACHE_INVALIDATIONS, RESPONSE_CACHE
+
+TAG_KEY_PREFIX = "cache-tag"
+RESPONSE_KEY_PREFIX = "tagged-response"
+LAST_INVALIDATION_KEY = "cache-tag-last-invalidation"
+
+LOCK_TIMEOUT = 10
+LOCK_WAIT_TIMEOUT = 5
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _tag_key(tag):
+    return f"{TAG_KEY_PREFIX}:{tag}"
+
+
+def _new_version():
+    # Generations are clock readings: an evicted tag never reuses an old one,
+    # and tagged_cache_page can tell a tag invalidated after a request started
+    # (web servers are assumed to keep their clocks in sync).
+    return time.time_ns()
+
+
+def get_tag_versions(tags, seed=None):
+    """
+    Returns the current generation of each tag, creating the missing ones
+    with ``seed`` (default: now).
+    """
+    keys = {_tag_key(tag): tag for tag in tags}
+    if not keys:
+        return {}
+    found = cache.get_many(list(keys))
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, seed or _new_version(), timeout=None)
+        found.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in found.items()}
+
+
+def peek_tag_version(tag):
+    """
+    Current generation of ``tag`` without creating it (None if missing), for
+    validators computed while a response is being rendered.
+    """
+    return cache.get(_tag_key(tag))
+
+
+def tags_are_current(versions):
+    if not versions:
+        return True
+    current = cache.get_many([_tag_key(tag) for tag in versions])
+    return all(
+        current.get(_tag_key(tag)) == version for tag, version in versions.items()
+    )
+
+
+def invalidate_tags(*tags):
+    """
+    Bumps the generation of each tag, dropping every entry that carries it.
+    """
+    tags = set(tags)
+    for tag in tags:
+        CACHE_INVALIDATIONS.labels(tag.split(":")[0]).inc()
+    if tags:
+        version = _new_version()
+        versions = {_tag_key(tag): version for tag in tags}
+        cache.set_many({**versions, LAST_INVALIDATION_KEY: version}, timeout=None)
+
+
+def invalidate_tags_on_commit(*tags):
+    """
+    ``invalidate_tags`` once the current transaction commits, so no reader
+    can cache the old rows under the new generation.
+    """
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def normalize_query_params(view, request):
+    """
+    Canonical query string for cache keys: params sorted by name, without
+    blank values and without params that only restate the pagination
+    defaults. Repeated values keep their order, which views may rely on.
+    """
+    defaults = {"page": "1"}
+    paginator = getattr(view, "paginator", None)
+    if paginator is not None and getattr(paginator, "page_size", None):
+        defaults[getattr(paginator, "page_size_query_param", None)] = str(
+            paginator.page_size
+        )
+
+    params = []
+    for name in sorted(request.GET):
+        for value in request.GET.getlist(name):
+            if value.strip() and defaults.get(name) != value:
+                params.append((name, value))
+    return urlencode(params)
+
+
+def build_cache_key(view, request, vary_on_user=False):
+    query = normalize_query_params(view, request)
+    digest = hashlib.md5(
+        "|".join([request.path, query, request.META.get("HTTP_ACCEPT", "")]).encode()
+    ).hexdigest()
+    scope = view.__class__.__name__
+    if vary_on_user:
+        scope = f"{scope}:user:{request.user.pk}"
+    return f"{RESPONSE_KEY_PREFIX}:{scope}:{digest}"
+
+
+def _get_valid_entry(key):
+    entry = cache.get(key)
+    if entry is not None and tags_are_current(entry["tags"]):
+        return entry
+    return None
+
+
+def _lock_key(key):
+    return f"{key}:lock"
+
+
+def _acquire_lock(key):
+    # cache.add is a SET NX with expiry, so only one worker gets the lock.
+    return cache.add(_lock_key(key), 1, LOCK_TIMEOUT)
+
+
+def _release_lock(key):
+    cache.delete(_lock_key(key))
+
+
+def _wait_for_entry(key):
+    deadline = time.monotonic() + LOCK_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = _get_valid_entry(key)
+        if entry is not None:
+            return entry
+        if cache.get(_lock_key(key)) is None:
+            # The lock holder gave up without storing anything.
+            return None
+    return None
+
+
+def _record(view, result):
+    RESPONSE_CACHE.labels(view.__class__.__name__, result).inc()
+
+
+def _cached_response(request, entry):
+    response = entry["response"]
+    return get_conditional_response(
+        request,
+        etag=response.get("ETag"),
+        last_modified=entry.get("last_modified"),
+        response=response,
+    )
+
+
+def _within_replica_lag(started):
+    # Right after an invalidation the replicas may still serve the old rows,
+    # which would then be cached under the new generation: render from the
+    # primary for DATABASE_PRIMARY_STICKY_SECONDS, the assumed replica lag.
+    if not replica_aliases():
+        return False
+    last = cache.get(LAST_INVALIDATION_KEY)
+    lag = getattr(settings, "DATABASE_PRIMARY_STICKY_SECONDS", 5) * 10**9
+    return last is not None and started - last < lag
+
+
+def _cache_lifetime(view, data, lifetime):
+    get_expiry = getattr(view, "get_cache_expiry", None)
+    expiry = get_expiry(data) if get_expiry else None
+    if expiry is None:
+        return lifetime
+    return min(lifetime, int(expiry.timestamp() - time.time()))
+
+
+def tagged_cache_page(timeout, vary_on_user=False, stale_timeout=None):
+    """
+    Caches the rendered response of a view method, like ``cache_page``, but
+    stores it with the generation of the tags returned by
+    ``view.get_cache_tags(data)``. The entry is dropped as soon as one of
+    those tags is invalidated.
+
+    With ``stale_timeout`` the entry is fresh for ``timeout`` seconds and kept
+    ``stale_timeout`` seconds longer: in that window callers get the stale
+    response while a single worker, holding a lock, regenerates it. Concurrent
+    misses for the same key also wait for that worker instead of all hitting
+    the database.
+
+    Views may also define ``get_cache_expiry(data)`` returning a datetime the
+    response must not outlive, stale window included (e.g. an ad ending).
+
+    With read replicas, misses in the first DATABASE_PRIMARY_STICKY_SECONDS
+    after any invalidation are rendered from the primary, so replica lag is
+    never cached.
+
+    Stored responses carry an ETag (hash of the body) and Last-Modified (the
+    newest tag generation) unless the view set its own, so conditional
+    requests hitting the cache get a 304 without touching the view.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def _wrapped(view, request, *args, **kwargs):
+            key = build_cache_key(view, request, vary_on_user)
+            locked = False
+            entry = _get_valid_entry(key)
+            if entry is not None:
+                if stale_timeout is None or time.time() < entry["fresh_until"]:
+                    _record(view, "hit")
+                    return _cached_response(request, entry)
+                locked = _acquire_lock(key)
+                if not locked:
+                    _record(view, "stale")
+                    return _cached_response(request, entry)
+            elif stale_timeout is not None:
+                locked = _acquire_lock(key)
+                if not locked:
+                    entry = _wait_for_entry(key)
+                    if entry is not None:
+                        _record(view, "hit")
+                        return _cached_response(request, entry)
+
+            _record(view, "miss")
+
+            # Anything invalidated after this point may be missing from the
+            # response, which is then not stored.
+            started = _new_version()
+            from_primary = _within_replica_lag(started)
+            try:
+                with primary_reads() if from_primary else nullcontext():
+                    response = view_method(view, request, *args, **kwargs)
+            except Exception:
+                if locked:
+                    _release_lock(key)
+                raise
+
+            if response.status_code == 200 and hasattr(
+                response, "add_post_render_callback"
+            ):
+
+                def _store(rendered):
+                    try:
+                        with primary_reads() if from_primary else nullcontext():
+                            lifetime = _cache_lifetime(
+                                view, rendered.data, timeout + (stale_timeout or 0)
+                            )
+                        if lifetime <= 0:
+                            return
+                        versions = get_tag_versions(
+                            view.get_cache_tags(rendered.data), seed=started
+                        )
+                        if any(version > started for version in versions.values()):
+                            return
+                        # Validators set by the view (conditional_get) win;
+                        # otherwise the body hash and the newest generation,
+                        # i.e. the last invalidation the data went through.
+                        if not rendered.has_header("ETag"):
+                            set_response_etag(rendered)
+                        if not rendered.has_header("Last-Modified"):
+                            changed = max(versions.values(), default=started)
+                            rendered["Last-Modified"] = http_date(changed // 10**9)
+                        entry = {
+                            "response": rendered,
+                            "tags": versions,
+                            "fresh_until": time.time() + min(timeout, lifetime),
+                            "last_modified": parse_http_date(rendered["Last-Modified"]),
+                        }
+                        cache.set(key, entry, lifetime)
+                    finally:
+                        if locked:
+                            _release_lock(key)
+
+                response.add_post_render_callback(_store)
+            elif locked:
+                _release_lock(key)
+            return response
+
+        return _wrapped
+
+    return decorator
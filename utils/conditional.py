@@ -0,0 +1,55 @@
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from utils.cache_tags import normalize_query_params
+
+
+def _variant(view, request):
+    # Everything besides the data the representation depends on.
+    return "|".join(
+        [
+            request.path,
+            normalize_query_params(view, request),
+            request.META.get("HTTP_ACCEPT", ""),
+            str(request.user.pk),
+        ]
+    )
+
+
+def conditional_get(view_method):
+    """
+    Answers ``If-None-Match``/``If-Modified-Since`` with 304 before the view
+    runs. ``view.get_conditional_validators()`` returns the values the
+    response is derived from (e.g. ``max(updated_at)`` and counts, one
+    aggregate query) and the last modification time, or None to skip; the
+    ETag is a hash of those values and the request variant.
+    """
+
+    @wraps(view_method)
+    def _wrapped(view, request, *args, **kwargs):
+        validators = view.get_conditional_validators()
+        if validators is None:
+            return view_method(view, request, *args, **kwargs)
+
+        values, modified = validators
+        source = f"{_variant(view, request)}|{values!r}"
+        etag = quote_etag(hashlib.md5(source.encode()).hexdigest())
+        last_modified = timegm(modified.utctimetuple()) if modified else None
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = view_method(view, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response.headers.setdefault("ETag", etag)
+        if last_modified:
+            response.headers.setdefault("Last-Modified", http_date(last_modified))
+        return response
+
+    return _wrapped
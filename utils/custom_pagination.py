@@ -1,16 +1,269 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the view's ``cursor_ordering`` columns, e.g.
+    ("-created_at", "id"). Each page is a range scan that starts right after
+    the last row of the previous one, so deep pages cost the same as the
+    first and no COUNT(*) is needed.
+
+    The cursor ordering is fixed, so ``?ordering=`` and ``?search=`` (whose
+    results are ordered by relevance) are rejected with 400.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    invalid_cursor_message = "Cursor inválido."
+    fixed_ordering_message = "Não disponível com paginação por cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = tuple(view.cursor_ordering)
+        self.page_size = self.get_page_size(request)
+        self.check_ordering(request)
+        position, self.reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(_flip(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(_after(ordering, position))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.rows = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def check_ordering(self, request):
+        for param in (api_settings.ORDERING_PARAM, api_settings.SEARCH_PARAM):
+            if request.query_params.get(param):
+                raise ValidationError({param: [self.fixed_ordering_message]})
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values, reverse = payload["p"], bool(payload.get("r"))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                model._meta.get_field(field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, row, reverse):
+        position = [_cursor_value(row, field) for field in self.ordering]
+        payload = {"p": position}
+        if reverse:
+            payload["r"] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        url = remove_query_param(self.request.build_absolute_uri(), "page")
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.rows:
+            return None
+        return self.encode_cursor(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.rows:
+            return None
+        return self.encode_cursor(self.rows[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+
+def _flip(field):
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+def _cursor_value(row, field):
+    value = getattr(row, field.lstrip("-"))
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _after(ordering, position):
+    # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y), per column direction.
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, position):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+class EstimatedCountPaginator(DjangoPaginator):
+    """
+    Avoids an exact COUNT(*) over large PostgreSQL querysets. Results the
+    planner expects to be small are counted exactly; above
+    PAGINATION_COUNT_ESTIMATE_THRESHOLD unfiltered querysets use the planner
+    estimate and filtered ones a count cached per SQL signature. Estimates
+    and counts are cached for PAGINATION_COUNT_CACHE_TIMEOUT seconds.
+
+    An inexact count only labels the envelope: pages past it are still
+    served while they have rows, and ``has_next`` comes from reading one row
+    ahead.
+    """
+
+    count_exact = True
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if (
+            not hasattr(queryset, "query")
+            or connections[queryset.db].vendor != "postgresql"
+        ):
+            return super().count
+
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+        signature = hashlib.md5(repr((queryset.db, sql, params)).encode()).hexdigest()
+        timeout = getattr(settings, "PAGINATION_COUNT_CACHE_TIMEOUT", 30)
+        estimate = cache.get_or_set(
+            f"pagination-estimate:{signature}",
+            lambda: _planner_estimate(queryset),
+            timeout,
+        )
+        threshold = getattr(settings, "PAGINATION_COUNT_ESTIMATE_THRESHOLD", 10000)
+        if estimate < threshold:
+            return queryset.count()
+
+        self.count_exact = False
+        if not queryset.query.where:
+            return estimate
+
+        key = f"pagination-count:{signature}"
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            self.count_exact = True
+            cache.set(key, count, timeout)
+        return count
+
+    def validate_number(self, number):
+        self.count  # Sets count_exact.
+        if self.count_exact:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.count_exact:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages["no_results"])
+        page = EstimatedPage(rows[: self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+
+class EstimatedPage(Page):
+    has_more = False
+
+    def has_next(self):
+        return self.has_more
+
+
+def _planner_estimate(queryset):
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
 
 
 class CustomPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
+    django_paginator_class = EstimatedCountPaginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request, view):
+            self.cursor_paginator = KeysetPagination()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def use_cursor(self, request, view):
+        # Opt-in: ?pagination=cursor or any request carrying a cursor. Blank
+        # values are dropped from cache keys, so they must not opt in either.
+        if not getattr(view, "cursor_ordering", None):
+            return False
+        return request.query_params.get("pagination") == "cursor" or bool(
+            request.query_params.get(KeysetPagination.cursor_query_param)
+        )
 
     def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
         return Response(
             {
                 "count": self.page.paginator.count,
+                "count_exact": self.page.paginator.count_exact,
                 "total_pages": self.page.paginator.num_pages,
                 "current_page": self.page.number,
                 "next": self.get_next_link(),
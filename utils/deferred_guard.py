@@ -0,0 +1,74 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.models.query_utils import DeferredAttribute
+
+logger = logging.getLogger(__name__)
+
+_guard_mode = ContextVar("deferred_field_guard_mode", default=None)
+_original_get = DeferredAttribute.__get__
+
+
+class DeferredFieldAccess(Exception):
+    pass
+
+
+def _guarded_get(self, instance, cls=None):
+    if instance is not None:
+        mode = _guard_mode.get()
+        attname = self.field.attname
+        if (
+            mode
+            and attname not in instance.__dict__
+            and self._check_parent_chain(instance) is None
+        ):
+            report_deferred_access(instance, attname, mode)
+    return _original_get(self, instance, cls)
+
+
+def report_deferred_access(instance, attname, mode):
+    message = (
+        f"Deferred field {instance._meta.label}.{attname} was loaded lazily "
+        f"(one extra query per row). Add it to .only() or stop deferring it."
+    )
+    if mode == "raise":
+        raise DeferredFieldAccess(message)
+    logger.warning(message)
+
+
+def install():
+    DeferredAttribute.__get__ = _guarded_get
+
+
+@contextmanager
+def deferred_field_guard(mode="raise"):
+    install()
+    token = _guard_mode.set(mode)
+    try:
+        yield
+    finally:
+        _guard_mode.reset(token)
+
+
+class DeferredFieldGuardMiddleware:
+    """
+    Reports every deferred field loaded while a request is handled, which is
+    how a serializer rendering a field left out of ``.only()`` turns a list
+    into N+1 queries. ``DEFERRED_FIELD_GUARD`` is "log", "raise" or None.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install()
+
+    def __call__(self, request):
+        mode = getattr(settings, "DEFERRED_FIELD_GUARD", None)
+        if not mode:
+            return self.get_response(request)
+        token = _guard_mode.set(mode)
+        try:
+            return self.get_response(request)
+        finally:
+            _guard_mode.reset(token)
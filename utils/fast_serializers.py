@@ -0,0 +1,150 @@
+from datetime import datetime
+from decimal import Decimal
+
+from django.db import models
+from rest_framework import fields, relations, serializers
+from rest_framework.settings import api_settings
+
+
+def _getter(field):
+    # Related fields resolve a PKOnlyObject without loading the relation, and
+    # fields with their own get_attribute do something else entirely.
+    if isinstance(field, (relations.RelatedField, relations.ManyRelatedField)) or (
+        type(field).get_attribute is not fields.Field.get_attribute
+    ):
+        return field.get_attribute
+
+    attrs = field.source_attrs
+
+    def get(instance):
+        value = instance
+        try:
+            for attr in attrs:
+                value = getattr(value, attr)
+        except Exception:
+            # Mappings, missing relations, defaults, SkipField: the slow path.
+            return field.get_attribute(instance)
+        if callable(value) and fields.is_simple_callable(value):
+            return field.get_attribute(instance)
+        return value
+
+    return get
+
+
+def _decimal(field):
+    coerce_to_string = getattr(
+        field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING
+    )
+    if (
+        not coerce_to_string
+        or field.localize
+        or field.normalize_output
+        or field.decimal_places is None
+    ):
+        return field.to_representation
+    exponent = -field.decimal_places
+    max_digits = field.max_digits
+
+    def to_representation(value):
+        # Database decimals already have the column scale, so quantize()
+        # would return them unchanged.
+        if type(value) is Decimal:
+            sign, digits, value_exponent = value.as_tuple()
+            if value_exponent == exponent and (
+                max_digits is None or len(digits) <= max_digits
+            ):
+                return f"{value:f}"
+        return field.to_representation(value)
+
+    return to_representation
+
+
+def _datetime(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != fields.ISO_8601:
+        return field.to_representation
+    # The active timezone is looked up once per page instead of per value.
+    field_timezone = (
+        field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    )
+    if field_timezone is None:
+        return field.to_representation
+
+    def to_representation(value):
+        if type(value) is datetime and value.utcoffset() is not None:
+            value = value.astimezone(field_timezone).isoformat()
+            if value.endswith("+00:00"):
+                value = value[:-6] + "Z"
+            return value
+        return field.to_representation(value)
+
+    return to_representation
+
+
+def _converter(field):
+    if isinstance(field, serializers.ListSerializer):
+        child = compile_serializer(field.child)
+
+        def to_representation(value):
+            if isinstance(value, models.manager.BaseManager):
+                value = value.all()
+            return [child(item) for item in value]
+
+        return to_representation
+    if isinstance(field, serializers.BaseSerializer):
+        return compile_serializer(field)
+    if type(field) is fields.CharField:
+        return str
+    if type(field) is fields.IntegerField:
+        return int
+    if type(field) is fields.DecimalField:
+        return _decimal(field)
+    if type(field) is fields.DateTimeField:
+        return _datetime(field)
+    return field.to_representation
+
+
+def compile_serializer(serializer):
+    """
+    Returns a function rendering one instance exactly like
+    ``serializer.to_representation``, with the readable fields, attribute
+    getters and converters resolved once instead of once per instance.
+    """
+    if (
+        type(serializer).to_representation
+        is not serializers.Serializer.to_representation
+    ):
+        return serializer.to_representation
+
+    readers = [
+        (field.field_name, _getter(field), _converter(field))
+        for field in serializer._readable_fields
+    ]
+
+    def represent(instance):
+        ret = {}
+        for name, get, convert in readers:
+            try:
+                attribute = get(instance)
+            except fields.SkipField:
+                continue
+            if isinstance(attribute, relations.PKOnlyObject):
+                check_for_none = attribute.pk
+            else:
+                check_for_none = attribute
+            ret[name] = None if check_for_none is None else convert(attribute)
+        return ret
+
+    return represent
+
+
+class FastListSerializer(serializers.ListSerializer):
+    """
+    ListSerializer for read-only list pages: compiles the child serializer
+    once per page. Set it as ``Meta.list_serializer_class``.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        represent = compile_serializer(self.child)
+        return [represent(item) for item in iterable]
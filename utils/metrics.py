@@ -0,0 +1,106 @@
+import os
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# With PROMETHEUS_MULTIPROC_DIR set, prometheus_client writes every sample to
+# per-process files in that directory and the endpoint merges them, so any
+# worker can answer a scrape for all of them. Dead workers must be marked with
+# mark_process_dead (see gunicorn.conf.py) or their live gauges linger.
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by view class.",
+    ["view", "method"],
+)
+REQUESTS = Counter(
+    "http_requests_total",
+    "Responses by view class and status code.",
+    ["view", "method", "status"],
+)
+DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL queries per request by view class.",
+    ["view"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+RESPONSE_CACHE = Counter(
+    "response_cache_requests_total",
+    "tagged_cache_page lookups by view class and result (hit, stale, miss).",
+    ["view", "result"],
+)
+CACHE_INVALIDATIONS = Counter(
+    "cache_tag_invalidations_total",
+    "Cache tag invalidations by tag kind (ad, product, store, ...).",
+    ["kind"],
+)
+SSE_CONNECTIONS = Gauge(
+    "sse_connections",
+    "Open server-sent event streams.",
+    multiprocess_mode="livesum",
+)
+
+
+def view_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    view = getattr(match.func, "view_class", None) or getattr(match.func, "cls", None)
+    return view.__name__ if view else match.func.__name__
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status code and SQL query count of every request under
+    the name of the view class that handled it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        view = view_label(request)
+        REQUEST_LATENCY.labels(view, request.method).observe(elapsed)
+        REQUESTS.labels(view, request.method, response.status_code).inc()
+        DB_QUERIES.labels(view).observe(queries)
+        return response
+
+
+def metrics_view(request):
+    user = getattr(request, "user", None)
+    allowed = request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+    if not allowed and not (user and user.is_staff):
+        return HttpResponseForbidden()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
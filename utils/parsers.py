@@ -0,0 +1,33 @@
+import io
+import re
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+# orjson reads integers outside the 64-bit range as floats; runs of 19+ digits
+# (maybe inside a string or a float, which only costs the slower parser) go to
+# DRF's parser, which keeps them exact.
+LONG_DIGITS = re.compile(rb"\d{19}")
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser on orjson for UTF-8 bodies. orjson always rejects NaN and
+    Infinity, as the strict JSONParser does; other charsets, non-strict
+    settings and bodies with integers orjson cannot hold use DRF's parser.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if not self.strict or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        if LONG_DIGITS.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,120 @@
+import csv
+
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+# Serializer output is already plain str/int/bool/None; everything else goes
+# through DRF's own encoder so the bytes match JSONRenderer's.
+_encoder = encoders.JSONEncoder()
+
+OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer on orjson. Produces the same bytes as DRF's compact, UTF-8
+    renderer; indented output (?indent=, the browsable API) and payloads
+    orjson rejects, e.g. integers above 64 bits, fall back to it.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer, keeping the output a JavaScript subset.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+def flatten(row, prefix=""):
+    """
+    {"product": {"name": "x"}} -> {"product.name": "x"}, for CSV columns.
+    """
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    One JSON document per line. ``stream()`` renders rows as they arrive.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return b"".join(self.stream(data if isinstance(data, list) else [data]))
+
+    def stream(self, rows, columns=None):
+        for row in rows:
+            yield orjson.dumps(row, default=_encoder.default, option=OPTIONS) + b"\n"
+
+
+# Cells starting with these run as formulas in Excel/LibreOffice/Sheets.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    CSV with a header row; nested objects become dotted columns
+    ("product.name") and lists a JSON cell. Text starting like a
+    spreadsheet formula is prefixed with a quote. ``stream()`` renders rows
+    as they arrive.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        columns = {}
+        for row in rows:
+            columns.update(dict.fromkeys(flatten(row)))
+        return b"".join(self.stream(rows, list(columns)))
+
+    def stream(self, rows, columns):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(columns).encode()
+        for row in rows:
+            flat = flatten(row)
+            yield writer.writerow(
+                [self.cell(flat.get(name)) for name in columns]
+            ).encode()
+
+    def cell(self, value):
+        if value is None:
+            return ""
+        if isinstance(value, (list, tuple)):
+            return orjson.dumps(
+                value, default=_encoder.default, option=OPTIONS
+            ).decode()
+        if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+            return f"'{value}"
+        return value
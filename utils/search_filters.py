@@ -0,0 +1,115 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db.models import F, Lookup, Q
+from django.db.models.functions import Greatest
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+WORD_RE = re.compile(r"\w+")
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    ``?search=`` backed by the view's tsvector column (``search_vector_field``,
+    GIN indexed) instead of ``icontains`` scans. Every word is matched as a
+    prefix and results are ranked, unless the client asked for an explicit
+    ``?ordering=``; list it after ``OrderingFilter`` so the rank wins over the
+    default ordering. Numeric searches also match the primary key directly.
+
+    ``search_related_fields`` maps a foreign key to a text field of a small
+    related table (e.g. ``{"category": "name"}``): matching rows are resolved
+    first and looked up by id.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        words = WORD_RE.findall(" ".join(self.get_search_terms(request)))
+        if not words:
+            return queryset
+
+        query = SearchQuery(
+            " & ".join(f"{word}:*" for word in words),
+            search_type="raw",
+            config=settings.FULL_TEXT_SEARCH_CONFIG,
+        )
+        vector = getattr(view, "search_vector_field", "search_vector")
+        condition = Q(**{vector: query})
+
+        term = " ".join(words)
+        if term.isascii() and term.isdigit():
+            condition |= Q(pk=int(term))
+        condition |= related_search_condition(queryset, view, term)
+
+        queryset = queryset.filter(condition).annotate(
+            search_rank=SearchRank(F(vector), query)
+        )
+        return order_by_relevance(request, queryset, "search_rank")
+
+
+class ILike(Lookup):
+    lookup_name = "ilike"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} ILIKE {rhs}", (*lhs_params, *rhs_params)
+
+
+class TrigramSearchFilter(SearchFilter):
+    """
+    Partial and typo tolerant ``?search=`` over ``search_fields`` using
+    pg_trgm. Both ``ILIKE '%term%'`` and word similarity (``%>``) are served
+    by ``gin_trgm_ops`` indexes on the searched columns. Results are ordered
+    by best similarity unless ``?ordering=`` is given; list it after
+    ``OrderingFilter``. Supports ``search_related_fields`` like
+    ``FullTextSearchFilter``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        fields = self.get_search_fields(view, request)
+        term = " ".join(self.get_search_terms(request))
+        if not fields or not term:
+            return queryset
+
+        pattern = "%{}%".format(
+            term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        condition = related_search_condition(queryset, view, term)
+        for field in fields:
+            condition |= Q(ILike(F(field), pattern))
+            condition |= Q(**{f"{field}__trigram_word_similar": term})
+
+        similarities = [TrigramWordSimilarity(term, field) for field in fields]
+        queryset = queryset.filter(condition).annotate(
+            search_similarity=(
+                Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+            )
+        )
+        return order_by_relevance(request, queryset, "search_similarity")
+
+
+def related_search_condition(queryset, view, term):
+    # Small lookup tables are searched first and joined back by id.
+    condition = Q()
+    for relation, field in getattr(view, "search_related_fields", {}).items():
+        related = queryset.model._meta.get_field(relation).related_model
+        ids = list(
+            related._base_manager.filter(**{f"{field}__icontains": term}).values_list(
+                "pk", flat=True
+            )[:100]
+        )
+        if ids:
+            condition |= Q(**{f"{relation}__in": ids})
+    return condition
+
+
+def order_by_relevance(request, queryset, score):
+    if request.query_params.get(api_settings.ORDERING_PARAM):
+        return queryset
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    return queryset.order_by(f"-{score}", *ordering)
@@ -0,0 +1,180 @@
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.storage import storages
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_timings = ContextVar("server_timings", default=None)
+_active = ContextVar("server_timing_active", default=None)
+
+CACHE_METHODS = [
+    "get",
+    "get_many",
+    "set",
+    "set_many",
+    "add",
+    "delete",
+    "delete_many",
+    "incr",
+    "decr",
+    "touch",
+    "has_key",
+]
+STORAGE_METHODS = ["url", "open", "save", "delete", "exists", "size"]
+
+_patched = set()
+
+
+class Timings:
+    def __init__(self):
+        self.durations = {}
+        self.counts = {}
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def ms(self, name):
+        return round(self.durations.get(name, 0.0) * 1000, 2)
+
+
+@contextmanager
+def timed(name):
+    """
+    Adds the time spent in the block to ``name`` when the request is sampled.
+    Only the outermost block counts, e.g. a cache call made by a storage call.
+    """
+    timings = _timings.get()
+    if timings is None or _active.get() is not None:
+        yield
+        return
+    token = _active.set(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+        _active.reset(token)
+
+
+def _timed_method(name, method):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with timed(name):
+            return method(*args, **kwargs)
+
+    return wrapper
+
+
+def _patch(cls, name, methods):
+    if cls in _patched:
+        return
+    for method in methods:
+        if hasattr(cls, method):
+            setattr(cls, method, _timed_method(name, getattr(cls, method)))
+    _patched.add(cls)
+
+
+def install():
+    # Patched on the backend classes, so FileFields with their own storage
+    # instance are timed too.
+    for alias in settings.CACHES:
+        _patch(type(caches[alias]), "cache", CACHE_METHODS)
+    for alias in settings.STORAGES:
+        _patch(type(storages[alias]), "storage", STORAGE_METHODS)
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    timings = _timings.get()
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add("db", time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """
+    For a sampled share of requests (SERVER_TIMING_SAMPLE_RATE) measures the
+    time spent in SQL, cache calls, storage calls and response rendering and
+    reports it as a ``Server-Timing`` header and as fields of one log record.
+    Unsampled requests only pay for a random() call.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install()
+
+    def __call__(self, request):
+        rate = getattr(settings, "SERVER_TIMING_SAMPLE_RATE", 0)
+        if not rate or random.random() >= rate:
+            return self.get_response(request)
+
+        timings = Timings()
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_db_wrapper))
+                response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+        timings.add("total", time.perf_counter() - started)
+
+        response["Server-Timing"] = self.header(timings)
+        self.log(request, response, timings)
+        return response
+
+    def process_template_response(self, request, response):
+        timings = _timings.get()
+        if timings is None:
+            return response
+        started = time.perf_counter()
+
+        def _rendered(rendered):
+            timings.add("render", time.perf_counter() - started)
+
+        response.add_post_render_callback(_rendered)
+        return response
+
+    def header(self, timings):
+        queries = timings.counts.get("db", 0)
+        metrics = [f'db;dur={timings.ms("db")};desc="{queries} queries"']
+        metrics += [
+            f"{name};dur={timings.ms(name)}"
+            for name in ("cache", "storage", "render", "total")
+        ]
+        return ", ".join(metrics)
+
+    def log(self, request, response, timings):
+        match = getattr(request, "resolver_match", None)
+        logger.info(
+            "%s %s %s %.1fms",
+            request.method,
+            request.path,
+            response.status_code,
+            timings.ms("total"),
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "view": match.view_name if match else None,
+                "status": response.status_code,
+                "db_ms": timings.ms("db"),
+                "db_queries": timings.counts.get("db", 0),
+                "cache_ms": timings.ms("cache"),
+                "cache_calls": timings.counts.get("cache", 0),
+                "storage_ms": timings.ms("storage"),
+                "storage_calls": timings.counts.get("storage", 0),
+                "render_ms": timings.ms("render"),
+                "total_ms": timings.ms("total"),
+            },
+        )
@@ -0,0 +1,213 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+OMIT_PARAM = "omit"
+
+
+def parse_fieldset(value):
+    """
+    "id,title,product.main_image" -> {"id": None, "title": None,
+    "product": {"main_image": None}}, None standing for the whole field.
+    """
+    tree = {}
+    for path in value.split(","):
+        names = [name.strip() for name in path.split(".")]
+        if not all(names):
+            continue
+        node = tree
+        for name in names[:-1]:
+            if name in node and node[name] is None:
+                break
+            node = node.setdefault(name, {})
+        else:
+            node[names[-1]] = None
+    return tree
+
+
+def requested_fieldsets(request):
+    """
+    Returns the (fields, omit) trees of a read request, None when not given.
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None, None
+    params = getattr(request, "query_params", request.GET)
+    trees = []
+    for param in (FIELDS_PARAM, OMIT_PARAM):
+        value = params.get(param, "").strip()
+        trees.append(parse_fieldset(value) if value else None)
+    return tuple(trees)
+
+
+def _path(serializer):
+    names = []
+    node = serializer
+    while node.parent is not None:
+        if node.field_name:
+            names.append(node.field_name)
+        node = node.parent
+    return names[::-1]
+
+
+class SparseFieldsMixin:
+    """
+    Trims a read serializer to ``?fields=`` and drops the ``?omit=`` fields,
+    e.g. ``?fields=id,title,product.main_image`` or ``?omit=description``.
+    Nested serializers with the mixin follow the dotted names; ``id`` is
+    always kept.
+    """
+
+    always_included_fields = ("id",)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        include, omit = requested_fieldsets(self.context.get("request"))
+        for name in _path(self):
+            include = include.get(name) if include is not None else None
+            omit = omit.get(name) if omit is not None else None
+
+        unknown = (set(include or ()) | set(omit or ())) - set(fields)
+        if unknown:
+            raise serializers.ValidationError(
+                {
+                    FIELDS_PARAM: [
+                        f"Campo desconhecido: {name}." for name in sorted(unknown)
+                    ]
+                }
+            )
+
+        for name in list(fields):
+            if name in self.always_included_fields:
+                continue
+            if include is not None and name not in include:
+                del fields[name]
+            elif omit is not None and name in omit and omit[name] is None:
+                del fields[name]
+        return fields
+
+
+class _Unknown(Exception):
+    pass
+
+
+def _parent(path):
+    return path.rpartition("__")[0]
+
+
+def _collect(serializer, model, prefix, columns, joins, many):
+    # Model columns, forward relations and to-many relations the serializer
+    # reads. Raises _Unknown for anything it cannot see through: properties,
+    # methods, SerializerMethodField.
+    for field in serializer._readable_fields:
+        nested = isinstance(field, serializers.BaseSerializer)
+        attrs = field.source_attrs
+        if isinstance(field, serializers.ListSerializer):
+            if len(attrs) != 1:
+                raise _Unknown
+            many.add(prefix + attrs[0])
+            continue
+        if not attrs:
+            if not nested:
+                raise _Unknown
+            _collect(field, model, prefix, columns, joins, many)
+            continue
+
+        current, path = model, prefix
+        for index, attr in enumerate(attrs):
+            last = index == len(attrs) - 1
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                # Plain class constants need no column.
+                value = getattr(current, attr, None)
+                if last and not nested and isinstance(value, (bool, int, str)):
+                    break
+                raise _Unknown
+            if model_field.many_to_many or model_field.one_to_many:
+                many.add(path + attr)
+                break
+            if not model_field.is_relation:
+                if not last:
+                    raise _Unknown
+                columns.add(path + attr)
+                break
+            if last and not nested:
+                # Primary key related fields only read the FK column.
+                columns.add(path + attr)
+                break
+            joins.add(path + attr)
+            current, path = model_field.related_model, f"{path}{attr}__"
+            if last:
+                _collect(field, current, path, columns, joins, many)
+
+
+def _selected_paths(select_related, prefix=""):
+    for name, children in select_related.items():
+        if children:
+            yield from _selected_paths(children, f"{prefix}{name}__")
+        else:
+            yield prefix + name
+
+
+class SparseFieldsFilter(BaseFilterBackend):
+    """
+    Narrows the queryset of a ``?fields=``/``?omit=`` request to what the
+    trimmed serializer renders: ``.only()`` the columns it reads and drop
+    the select_related joins and prefetches nothing reads any more.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if requested_fieldsets(request) == (None, None):
+            return queryset
+        serializer = view.get_serializer()
+        if not isinstance(serializer, SparseFieldsMixin):
+            return queryset
+        selected = queryset.query.select_related
+        if selected is True:
+            return queryset
+
+        columns, joins, many = set(), set(), set()
+        try:
+            _collect(serializer, queryset.model, "", columns, joins, many)
+        except _Unknown:
+            return queryset
+
+        # Keep each original join only as deep as something still reads it.
+        kept = set()
+        for path in _selected_paths(selected or {}):
+            names = path.split("__")
+            for end in range(len(names), 0, -1):
+                if "__".join(names[:end]) in joins:
+                    kept.add("__".join(names[:end]))
+                    break
+        joined = {""}
+        for path in kept:
+            names = path.split("__")
+            joined.update("__".join(names[:end]) for end in range(1, len(names) + 1))
+        # Relations that are not joined are loaded lazily through their FK.
+        columns = {column for column in columns if _parent(column) in joined}
+        columns |= {join for join in joins if _parent(join) in joined}
+
+        queryset = queryset.select_related(None)
+        if kept:
+            queryset = queryset.select_related(*kept)
+
+        lookups = queryset._prefetch_related_lookups
+        if lookups:
+            read = {path.split("__")[0] for path in joins | many}
+            queryset = queryset.prefetch_related(None).prefetch_related(
+                *[lookup for lookup in lookups if self._first(lookup) in read]
+            )
+
+        # Keyset pagination reads the ordering columns of the edge rows.
+        for name in getattr(view, "cursor_ordering", None) or ():
+            if "__" not in name:
+                columns.add(name.lstrip("-"))
+        return queryset.only(*(columns or [queryset.model._meta.pk.name]))
+
+    def _first(self, lookup):
+        path = lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+        return path.split("__")[0]